@@ -1,5 +1,18 @@
+import hashlib
+import itertools
+import mmap
+import re
+import struct
+import sys
+from collections import namedtuple
+from dataclasses import dataclass
 from enum import Enum
-from typing import List, Tuple
+from functools import cached_property
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+GRID_MAGIC = b"D18G"
+GRID_HEADER = struct.Struct("<4sII")  # magic, grid length, grid width
+RULE_PATTERN = re.compile(r"B([0-8]*)/S([0-8]*)")
 
 
 def read_input(filename: str):
@@ -16,11 +29,228 @@ class LightStatus(Enum):
     OFF = "."
 
 
-class LightGrid:
+CENTRE_BIT = 4  # neighbourhood index bit 3 * row + column, for a 3x3 neighbourhood
+
+
+@dataclass(frozen=True)
+class LifeRule:
+    """Life-like Rule: neighbours on that switch a light on (birth) or keep it on"""
+
+    birth: frozenset
+    survival: frozenset
+
+    @classmethod
+    def from_string(cls, rule: str):
+        """Return rule from B/S notation, e.g. "B3/S23" """
+        match = RULE_PATTERN.fullmatch(rule.strip().upper())
+        if match is None:
+            raise ValueError(f"Rule {rule!r} is not in B/S notation, e.g. B3/S23")
+        birth, survival = match.groups()
+        return cls(frozenset(map(int, birth)), frozenset(map(int, survival)))
+
+    def __str__(self) -> str:
+        birth = "".join(map(str, sorted(self.birth)))
+        survival = "".join(map(str, sorted(self.survival)))
+        return f"B{birth}/S{survival}"
+
+    @cached_property
+    def table(self) -> bytes:
+        """512 entry lookup of next value (1 on, 0 off) by 3x3 neighbourhood index"""
+        table = bytearray(512)
+        for index in range(512):
+            centre_on = index >> CENTRE_BIT & 1
+            neighbours_on = index.bit_count() - centre_on
+            next_on = self.survival if centre_on else self.birth
+            table[index] = neighbours_on in next_on
+        return bytes(table)
+
+    @staticmethod
+    def index(centre_on: bool, neighbours_on: int) -> int:
+        """Return a neighbourhood index with centre_on and neighbours_on neighbours on
+        Life-like rules only depend on the count, so any such neighbourhood will do
+        """
+        neighbours = (1 << neighbours_on) - 1
+        low_bits = neighbours & ((1 << CENTRE_BIT) - 1)
+        high_bits = neighbours >> CENTRE_BIT << (CENTRE_BIT + 1)
+        return low_bits | high_bits | centre_on << CENTRE_BIT
+
+
+CONWAY = LifeRule.from_string("B3/S23")
+
+
+def require_conway(rule: LifeRule, grid_class: type) -> None:
+    """Raise ValueError unless rule is CONWAY, for grids hard-wired to B3/S23"""
+    # compare fields, as rules may come from day_18 run as __main__
+    if (rule.birth, rule.survival) != (CONWAY.birth, CONWAY.survival):
+        raise ValueError(f"{grid_class.__name__} only supports {CONWAY}, not {rule}")
+
+
+def _pack_row(row: Iterable[str]) -> int:
+    """Return row of LightStatus values as an int with bit column set per light on"""
+    return sum(
+        1 << column
+        for column, status in enumerate(row)
+        if status == LightStatus.ON.value
+    )
+
+
+def _row_bytes(row: int, grid_width: int) -> bytes:
+    """Return packed row as ceil(grid_width / 8) little endian bytes"""
+    return row.to_bytes((grid_width + 7) // 8, "little")
+
+
+def write_binary(filename: str, rows: Iterable[bytes], grid_width: int) -> None:
+    """Write packed row bytes as a binary grid file (header then one entry per row)"""
+    with open(filename, "wb") as filehandle:
+        filehandle.write(GRID_HEADER.pack(GRID_MAGIC, 0, grid_width))
+        grid_length = 0
+        for grid_length, row in enumerate(rows, 1):
+            filehandle.write(row)
+        filehandle.seek(0)
+        filehandle.write(GRID_HEADER.pack(GRID_MAGIC, grid_length, grid_width))
+
+
+def convert_text_to_binary(text_filename: str, binary_filename: str) -> None:
+    """Stream a #/. Light Grid Input File into the binary grid format, row by row"""
+    with open(text_filename, "r", encoding="utf-8") as filehandle:
+        lines = (line.strip() for line in filehandle if line.strip())
+        first_line = next(lines)
+
+        def packed_rows():
+            for line in itertools.chain([first_line], lines):
+                if len(line) != len(first_line):
+                    raise ValueError(f"{text_filename} rows differ in width")
+                yield _row_bytes(_pack_row(line), len(first_line))
+
+        write_binary(binary_filename, packed_rows(), len(first_line))
+
+
+def read_binary(filename: str) -> Tuple[memoryview, int, int]:
+    """Memory map a binary grid file
+    Returns (packed rows, grid length, grid width) without reading the rows
+    """
+    with open(filename, "rb") as filehandle:
+        grid_file = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, grid_length, grid_width = GRID_HEADER.unpack_from(grid_file)
+    if magic != GRID_MAGIC:
+        raise ValueError(f"{filename} is not a binary Light Grid")
+    return memoryview(grid_file)[GRID_HEADER.size :], grid_length, grid_width
+
+
+def _changed_lights(
+    previous_rows: List[int], current_rows: List[int]
+) -> Iterator[Tuple[int, int]]:
+    """Yield (x, y) of every light that differs between two lists of packed rows"""
+    for y, (previous_row, current_row) in enumerate(zip(previous_rows, current_rows)):
+        difference = previous_row ^ current_row
+        while difference:
+            lowest_bit = difference & -difference
+            yield lowest_bit.bit_length() - 1, y
+            difference ^= lowest_bit
+
+
+NEIGHBOUR_OFFSETS = tuple(
+    (x_offset, y_offset)
+    for y_offset in (-1, 0, 1)
+    for x_offset in (-1, 0, 1)
+    if x_offset or y_offset
+)
+
+
+Generation = namedtuple("Generation", ("step", "lights_on", "changed"))
+
+
+class StepExecutor:
+    """Shared stepping for Light Grids with corners stuck on (ABSTRACT)
+    Subclasses provide set_corners_on, _execute_one_step and _packed_rows
+    """
+
+    def iter_generations(
+        self,
+        number_of_steps: Optional[int] = None,
+        every: int = 1,
+        deltas: bool = False,
+    ) -> Iterator[Generation]:
+        """Lazily step the grid, yielding every `every`th generation from generation 0
+        Each Generation holds the live count and, with deltas, the (x, y) of lights
+        that changed since the previous yielded generation. Runs forever if
+        number_of_steps is None; the grid is left at the last generation stepped
+        """
+        if every < 1:
+            raise ValueError(f"every must be at least 1, not {every}")
+        return self._generations(number_of_steps, every, deltas)
+
+    def _generations(
+        self, number_of_steps: Optional[int], every: int, deltas: bool
+    ) -> Iterator[Generation]:
+        """Generator behind iter_generations, once its arguments are checked"""
+        self.set_corners_on()
+        previous_rows = self._packed_rows() if deltas else None
+        yield Generation(0, self.number_of_lights_on, () if deltas else None)
+        step = 0
+        while number_of_steps is None or step < number_of_steps:
+            self._execute_one_step()
+            self.set_corners_on()
+            step += 1
+            if step % every:
+                continue
+            changed = None
+            if deltas:
+                current_rows = self._packed_rows()
+                changed = tuple(_changed_lights(previous_rows, current_rows))
+                previous_rows = current_rows
+            yield Generation(step, self.number_of_lights_on, changed)
+
+    def execute_steps(self, number_of_steps: int, detect_cycles: bool = False) -> None:
+        """Execute number of steps
+        With detect_cycles, a digest of each generation is kept and once one repeats
+        the remaining whole cycles are skipped
+        """
+        seen_at_step = {}
+        step = 0
+        while step < number_of_steps:
+            self.set_corners_on()
+            if detect_cycles:
+                digest = self._digest()
+                if digest in seen_at_step:
+                    cycle_length = step - seen_at_step[digest]
+                    number_of_steps = step + (number_of_steps - step) % cycle_length
+                    detect_cycles = False
+                    continue
+                seen_at_step[digest] = step
+            self._execute_one_step()
+            step += 1
+        self.set_corners_on()
+
+    def _digest(self) -> bytes:
+        """Return compact digest of the packed grid"""
+        return self._hash(
+            b"".join(_row_bytes(row, self.grid_width) for row in self._packed_rows())
+        )
+
+    @staticmethod
+    def _hash(packed_grid: bytes) -> bytes:
+        """Return compact digest of a packed grid"""
+        return hashlib.blake2b(packed_grid, digest_size=16).digest()
+
+
+class LightGrid(StepExecutor):
     """Representation of a Light Grid"""
 
-    def __init__(self, light_status: List) -> None:
+    _padded = None  # flattened bordered grid, only while a step is running
+
+    def __init__(self, light_status: List, rule: LifeRule = CONWAY) -> None:
         self.light_status = light_status
+        self.rule = rule
+
+    @classmethod
+    def from_binary(cls, filename: str, rule: LifeRule = CONWAY):
+        """Load grid from binary grid file"""
+        return cls(PackedLightGrid.from_binary(filename).light_status, rule)
+
+    def to_binary(self, filename: str) -> None:
+        """Save grid to binary grid file"""
+        PackedLightGrid(self.light_status).to_binary(filename)
 
     @property
     def grid_length(self) -> int:
@@ -32,27 +262,31 @@ class LightGrid:
         """Number of columns in grid"""
         return len(self.light_status[0])
 
-    def _get_neighbours(self, location: Tuple[int, int]) -> List:
-        """Return list of valid neighbours"""
+    def _get_neighbours(self, location: Tuple[int, int]) -> Tuple:
+        """Return tuple of valid neighbours"""
         x, y = location
-        neighbours = {
-            (x - 1, y - 1),
-            (x - 1, y),
-            (x - 1, y + 1),
-            (x, y - 1),
-            (x, y + 1),
-            (x + 1, y - 1),
-            (x + 1, y),
-            (x + 1, y + 1),
-        }
-
-        for neighbour in neighbours.copy():
-            x, y = neighbour
-            if 0 <= x < self.grid_width and 0 <= y < self.grid_length:
-                continue
-            neighbours.discard(neighbour)
+        return tuple(
+            (x + x_offset, y + y_offset)
+            for x_offset, y_offset in NEIGHBOUR_OFFSETS
+            if 0 <= x + x_offset < self.grid_width
+            and 0 <= y + y_offset < self.grid_length
+        )
 
-        return neighbours
+    def _pad(self) -> None:
+        """Flatten the grid inside a border of lights that are off, for this step
+        Every location then has all 8 neighbours at fixed offsets in _padded
+        """
+        stride = self.grid_width + 2
+        padded = [LightStatus.OFF.value] * stride
+        for row in self.light_status:
+            padded.append(LightStatus.OFF.value)
+            padded.extend(row)
+            padded.append(LightStatus.OFF.value)
+        padded.extend([LightStatus.OFF.value] * stride)
+        self._padded = padded
+        self._padded_offsets = tuple(
+            y_offset * stride + x_offset for x_offset, y_offset in NEIGHBOUR_OFFSETS
+        )
 
     def _get_light_status(self, location: Tuple[int, int]) -> LightStatus:
         x, y = location
@@ -62,33 +296,41 @@ class LightGrid:
         return LightStatus.OFF.value
 
     def _get_neighbours_that_are_on(self, location: Tuple[int, int]) -> int:
+        on = LightStatus.ON.value
+        if self._padded is None:
+            light_status = self.light_status
+            return sum(
+                light_status[y][x] == on for x, y in self._get_neighbours(location)
+            )
+        x, y = location
+        padded = self._padded
+        centre = (y + 1) * (self.grid_width + 2) + x + 1
         number_on = 0
-        for neighbour in self._get_neighbours(location):
-            if self._get_light_status(neighbour) is LightStatus.ON:
+        for offset in self._padded_offsets:
+            if padded[centre + offset] == on:
                 number_on += 1
         return number_on
 
-    def execute_steps(self, number_of_steps: int) -> None:
-        """Execute number of steps"""
-        for _ in range(number_of_steps):
-            self.set_corners_on()
-            self._execute_one_step()
-        self.set_corners_on()
+    def _packed_rows(self) -> List[int]:
+        return [_pack_row(row) for row in self.light_status]
 
     def _get_new_value(self, location) -> str:
         x, y = location
         neighbours_on = self._get_neighbours_that_are_on(location)
-        if self.light_status[y][x] is LightStatus.ON.value and 2 <= neighbours_on <= 3:
-            return LightStatus.ON.value
-        if self.light_status[y][x] is LightStatus.OFF.value and neighbours_on == 3:
+        centre_on = self.light_status[y][x] == LightStatus.ON.value
+        if self.rule.table[self.rule.index(centre_on, neighbours_on)]:
             return LightStatus.ON.value
         return LightStatus.OFF.value
 
     def _execute_one_step(self) -> None:
         new_grid = [["."] * self.grid_width for _ in range(self.grid_length)]
-        for row in range(self.grid_length):
-            for column in range(self.grid_width):
-                new_grid[row][column] = self._get_new_value((column, row))
+        self._pad()
+        try:
+            for row in range(self.grid_length):
+                for column in range(self.grid_width):
+                    new_grid[row][column] = self._get_new_value((column, row))
+        finally:
+            self._padded = None
         self.light_status = new_grid
 
     def set_corners_on(self) -> None:
@@ -116,13 +358,133 @@ class LightGrid:
         return lights_on
 
 
-def main():
+class PackedLightGrid(StepExecutor):
+    """Representation of a Light Grid packed as one bit per light
+    Each row is a Python int with bit column set when that light is on
+    """
+
+    def __init__(self, light_status: List, rule: LifeRule = CONWAY) -> None:
+        require_conway(rule, type(self))
+        self.rows = [_pack_row(row) for row in light_status]
+        self.grid_width = len(light_status[0])
+
+    @classmethod
+    def from_binary(cls, filename: str, rule: LifeRule = CONWAY):
+        """Load grid from binary grid file"""
+        require_conway(rule, cls)
+        packed_rows, grid_length, grid_width = read_binary(filename)
+        row_length = (grid_width + 7) // 8
+        grid = cls.__new__(cls)
+        grid.grid_width = grid_width
+        grid.rows = [
+            int.from_bytes(packed_rows[start : start + row_length], "little")
+            for start in range(0, grid_length * row_length, row_length)
+        ]
+        return grid
+
+    def to_binary(self, filename: str) -> None:
+        """Save grid to binary grid file"""
+        write_binary(
+            filename,
+            (_row_bytes(row, self.grid_width) for row in self.rows),
+            self.grid_width,
+        )
+
+    @property
+    def grid_length(self) -> int:
+        """Number of rows in grid"""
+        return len(self.rows)
+
+    @property
+    def light_status(self) -> List:
+        """Grid as rows of LightStatus values"""
+        return [
+            [
+                LightStatus.ON.value if row >> column & 1 else LightStatus.OFF.value
+                for column in range(self.grid_width)
+            ]
+            for row in self.rows
+        ]
+
+    def _packed_rows(self) -> List[int]:
+        return list(self.rows)
+
+    def _execute_one_step(self) -> None:
+        """Advance every row at once using a bit-sliced neighbour counter
+        Neighbour count is held mod 8 in bit planes (ones, twos, fours); 8 wraps to 0,
+        which like every count other than 2 and 3 leaves the light off
+        """
+        width_mask = (1 << self.grid_width) - 1
+        padded = [0, *self.rows, 0]
+        new_rows = []
+        for above, current, below in zip(padded, padded[1:], padded[2:]):
+            ones = twos = fours = 0
+            for neighbour in (
+                above << 1,
+                above,
+                above >> 1,
+                current << 1,
+                current >> 1,
+                below << 1,
+                below,
+                below >> 1,
+            ):
+                carry = ones & neighbour
+                ones ^= neighbour
+                fours ^= twos & carry
+                twos ^= carry
+            new_rows.append(~fours & twos & (ones | current) & width_mask)
+        self.rows = new_rows
+
+    def set_corners_on(self) -> None:
+        corners = 1 | 1 << (self.grid_width - 1)
+        self.rows[0] |= corners
+        self.rows[-1] |= corners
+
+    def print_light_grid(self) -> None:
+        for row in self.light_status:
+            print("".join(row))
+
+    @property
+    def number_of_lights_on(self) -> int:
+        """Return number of lights on"""
+        return sum(row.bit_count() for row in self.rows)
+
+
+def get_grid_class(backend: str):
+    """Return LightGrid class for named backend"""
+    match backend:
+        case "numpy":
+            from day_18_numpy import NumpyLightGrid
+
+            return NumpyLightGrid
+        case "parallel":
+            from day_18_parallel import ParallelLightGrid
+
+            return ParallelLightGrid
+        case "tiled":
+            from day_18_numpy import TiledLightGrid
+
+            return TiledLightGrid
+        case "hashlife":
+            from day_18_hashlife import HashlifeLightGrid
+
+            return HashlifeLightGrid
+        case "packed":
+            return PackedLightGrid
+        case "list":
+            return LightGrid
+    raise ValueError(f"Unknown grid backend: {backend}")
+
+
+def main(backend: str = "list", rule: str = str(CONWAY)):
     """Main Solution"""
     initial_light_status = read_input("day_18_input.txt")
-    my_lights = LightGrid(initial_light_status)
+    grid_class = get_grid_class(backend)
+    my_lights = grid_class(initial_light_status, rule=LifeRule.from_string(rule))
     my_lights.execute_steps(100)
     print(my_lights.number_of_lights_on)
 
 
 if __name__ == "__main__":
-    main()
+    main(*sys.argv[1:3])
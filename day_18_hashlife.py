@@ -0,0 +1,237 @@
+"""Hashlife Engine for Day 18
+
+Advances Life on the unbounded plane by power of two step counts using a
+canonicalised quadtree with memoised futures. The puzzle grid is bounded and
+has its corners stuck on, which Hashlife cannot represent, so HashlifeLightGrid
+steps the bounded variant with PackedLightGrid instead.
+"""
+
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+from day_18 import CONWAY, LifeRule, LightStatus, PackedLightGrid, require_conway
+
+NODE_CACHE_SIZE = 2**20  # LRU limit on canonical nodes and memoised futures
+
+
+class Node:
+    """Quadtree node covering a 2**level square: nw, ne, sw and se quadrants"""
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level: int, nw, ne, sw, se, population: int) -> None:
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+
+
+OFF = Node(0, None, None, None, None, 0)
+ON = Node(0, None, None, None, None, 1)
+
+
+@lru_cache(maxsize=NODE_CACHE_SIZE)
+def join(nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+    """Return canonical node with the given quadrants"""
+    population = nw.population + ne.population + sw.population + se.population
+    return Node(nw.level + 1, nw, ne, sw, se, population)
+
+
+@lru_cache(maxsize=None)
+def empty(level: int) -> Node:
+    """Return canonical empty node of level"""
+    if level == 0:
+        return OFF
+    quadrant = empty(level - 1)
+    return join(quadrant, quadrant, quadrant, quadrant)
+
+
+def centre(node: Node) -> Node:
+    """Return node one level up with node in its centre"""
+    border = empty(node.level - 1)
+    return join(
+        join(border, border, border, node.nw),
+        join(border, border, node.ne, border),
+        join(border, node.sw, border, border),
+        join(node.se, border, border, border),
+    )
+
+
+def _is_padded(node: Node) -> bool:
+    """Return True if every live cell is in the centre quarter of node"""
+    return (
+        node.nw.population == node.nw.se.se.population
+        and node.ne.population == node.ne.sw.sw.population
+        and node.sw.population == node.sw.ne.ne.population
+        and node.se.population == node.se.nw.nw.population
+    )
+
+
+def _next_value(centre_cell: Node, neighbours: Tuple[Node, ...]) -> Node:
+    neighbours_on = sum(neighbour.population for neighbour in neighbours)
+    if neighbours_on == 3 or (centre_cell is ON and neighbours_on == 2):
+        return ON
+    return OFF
+
+
+def _step_4x4(node: Node) -> Node:
+    """Return centre 2x2 of a level 2 node one generation ahead"""
+    rows = [
+        [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+        [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+        [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+        [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+    ]
+    quadrants = []
+    for row, column in ((1, 1), (1, 2), (2, 1), (2, 2)):
+        neighbours = tuple(
+            rows[row + row_offset][column + column_offset]
+            for row_offset in (-1, 0, 1)
+            for column_offset in (-1, 0, 1)
+            if row_offset or column_offset
+        )
+        quadrants.append(_next_value(rows[row][column], neighbours))
+    return join(*quadrants)
+
+
+@lru_cache(maxsize=NODE_CACHE_SIZE)
+def successor(node: Node, step_power: int) -> Node:
+    """Return centre of node (one level down) after 2**step_power generations
+    step_power must be at most node.level - 2
+    """
+    if node.population == 0:
+        return node.nw
+    if node.level == 2:
+        return _step_4x4(node)
+
+    nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+    parts = [
+        join(nw.nw, nw.ne, nw.sw, nw.se),
+        join(nw.ne, ne.nw, nw.se, ne.sw),
+        join(ne.nw, ne.ne, ne.sw, ne.se),
+        join(nw.sw, nw.se, sw.nw, sw.ne),
+        join(nw.se, ne.sw, sw.ne, se.nw),
+        join(ne.sw, ne.se, se.nw, se.ne),
+        join(sw.nw, sw.ne, sw.sw, sw.se),
+        join(sw.ne, se.nw, sw.se, se.sw),
+        join(se.nw, se.ne, se.sw, se.se),
+    ]
+    if step_power < node.level - 2:
+        # Half the generations: take the centre of each part without stepping again
+        c1, c2, c3, c4, c5, c6, c7, c8, c9 = (
+            successor(part, step_power) for part in parts
+        )
+        return join(
+            join(c1.se, c2.sw, c4.ne, c5.nw),
+            join(c2.se, c3.sw, c5.ne, c6.nw),
+            join(c4.se, c5.sw, c7.ne, c8.nw),
+            join(c5.se, c6.sw, c8.ne, c9.nw),
+        )
+    c1, c2, c3, c4, c5, c6, c7, c8, c9 = (
+        successor(part, step_power - 1) for part in parts
+    )
+    return join(
+        successor(join(c1, c2, c4, c5), step_power - 1),
+        successor(join(c2, c3, c5, c6), step_power - 1),
+        successor(join(c4, c5, c7, c8), step_power - 1),
+        successor(join(c5, c6, c8, c9), step_power - 1),
+    )
+
+
+def advance(node: Node, number_of_steps: int) -> Node:
+    """Return node advanced number_of_steps generations, keeping its centre fixed"""
+    step_power = 0
+    while number_of_steps:
+        if number_of_steps & 1:
+            while node.level < max(step_power + 2, 3) or not _is_padded(node):
+                node = centre(node)
+            node = successor(centre(node), step_power)
+        number_of_steps >>= 1
+        step_power += 1
+    return node
+
+
+def live_cells(node: Node, x: int = 0, y: int = 0) -> Iterator[Tuple[int, int]]:
+    """Yield (x, y) of every live cell, with node's top left corner at (x, y)"""
+    if node.population == 0:
+        return
+    if node.level == 0:
+        yield x, y
+        return
+    half = 1 << (node.level - 1)
+    yield from live_cells(node.nw, x, y)
+    yield from live_cells(node.ne, x + half, y)
+    yield from live_cells(node.sw, x, y + half)
+    yield from live_cells(node.se, x + half, y + half)
+
+
+def build(light_status: List) -> Tuple[Node, int]:
+    """Return (node, level) of a 2**level square with light_status at its top left"""
+    level = max(len(light_status), len(light_status[0]), 2).bit_length()
+
+    def build_quadrant(level: int, x: int, y: int) -> Node:
+        if level == 0:
+            on = 0 <= y < len(light_status) and 0 <= x < len(light_status[y])
+            return ON if on and light_status[y][x] == LightStatus.ON.value else OFF
+        half = 1 << (level - 1)
+        return join(
+            build_quadrant(level - 1, x, y),
+            build_quadrant(level - 1, x + half, y),
+            build_quadrant(level - 1, x, y + half),
+            build_quadrant(level - 1, x + half, y + half),
+        )
+
+    return build_quadrant(level, 0, 0), level
+
+
+class HashlifeLightGrid:
+    """Light Grid advanced with Hashlife
+
+    With unbounded=False (the puzzle rules: lights beyond the edge stay off and the
+    corners are stuck on) Hashlife does not apply, so steps fall back to
+    PackedLightGrid. With unbounded=True lights evolve on the infinite plane with
+    no stuck corners and steps are memoised power of two jumps.
+    """
+
+    def __init__(
+        self, light_status: List, unbounded: bool = False, rule: LifeRule = CONWAY
+    ) -> None:
+        require_conway(rule, type(self))
+        self.unbounded = unbounded
+        self.grid_length = len(light_status)
+        self.grid_width = len(light_status[0])
+        self.root, level = build(light_status)
+        # root is centred on a fixed point; record where the grid's top left sits
+        self.origin = 1 << (level - 1)
+
+    def execute_steps(self, number_of_steps: int, detect_cycles: bool = False) -> None:
+        """Execute number of steps
+        detect_cycles only applies to the bounded fallback
+        """
+        if not self.unbounded:
+            fallback = PackedLightGrid(self.light_status)
+            fallback.execute_steps(number_of_steps, detect_cycles)
+            self.root, level = build(fallback.light_status)
+            self.origin = 1 << (level - 1)
+            return
+        self.root = advance(self.root, number_of_steps)
+
+    @property
+    def light_status(self) -> List:
+        """Grid window as rows of LightStatus values"""
+        light_status = [
+            [LightStatus.OFF.value] * self.grid_width for _ in range(self.grid_length)
+        ]
+        offset = (1 << (self.root.level - 1)) - self.origin
+        for x, y in live_cells(self.root, -offset, -offset):
+            if 0 <= x < self.grid_width and 0 <= y < self.grid_length:
+                light_status[y][x] = LightStatus.ON.value
+        return light_status
+
+    def print_light_grid(self) -> None:
+        for row in self.light_status:
+            print("".join(row))
+
+    @property
+    def number_of_lights_on(self) -> int:
+        """Return number of lights on, anywhere on the plane when unbounded"""
+        return self.root.population
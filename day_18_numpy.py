@@ -0,0 +1,175 @@
+"""NumPy backed Light Grid for Day 18"""
+
+from typing import List
+
+import numpy as np
+
+from day_18 import (
+    CONWAY,
+    LifeRule,
+    LightStatus,
+    StepExecutor,
+    read_binary,
+    write_binary,
+)
+
+
+def next_generation(padded: np.ndarray, rule_table: np.ndarray) -> np.ndarray:
+    """Return next generation of the interior of a padded region from a rule table
+    Each light's 3x3 neighbourhood is packed into a 9 bit index, bit 3 * row + column
+    """
+    length, width = padded.shape[0] - 2, padded.shape[1] - 2
+    index = np.zeros((length, width), dtype=np.uint16)
+    for row_offset in range(3):
+        for column_offset in range(3):
+            neighbour = padded[
+                row_offset : row_offset + length,
+                column_offset : column_offset + width,
+            ]
+            index |= neighbour.astype(np.uint16) << (3 * row_offset + column_offset)
+    return rule_table[index]
+
+
+class NumpyLightGrid(StepExecutor):
+    """Representation of a Light Grid held as a uint8 array"""
+
+    def __init__(self, light_status: List, rule: LifeRule = CONWAY) -> None:
+        self.lights = self._to_array(light_status)
+        self.rule = rule
+
+    @property
+    def rule_table(self) -> np.ndarray:
+        """Rule lookup table as an array"""
+        return np.frombuffer(self.rule.table, dtype=np.uint8)
+
+    @staticmethod
+    def _to_array(light_status: List) -> np.ndarray:
+        """Return rows of LightStatus values (or a uint8 array) as a uint8 array"""
+        if isinstance(light_status, np.ndarray):
+            return light_status.astype(np.uint8, copy=False)
+        return (np.array(light_status) == LightStatus.ON.value).astype(np.uint8)
+
+    @classmethod
+    def from_binary(cls, filename: str, rule: LifeRule = CONWAY):
+        """Load grid from binary grid file, unpacking straight from the mapped file"""
+        packed_rows, grid_length, grid_width = read_binary(filename)
+        packed = np.frombuffer(
+            packed_rows, dtype=np.uint8, count=grid_length * ((grid_width + 7) // 8)
+        )
+        lights = np.unpackbits(
+            packed.reshape(grid_length, -1), axis=1, count=grid_width, bitorder="little"
+        )
+        return cls(lights, rule=rule)
+
+    def to_binary(self, filename: str) -> None:
+        """Save grid to binary grid file"""
+        packed = np.packbits(self.lights, axis=1, bitorder="little")
+        write_binary(filename, packed, self.grid_width)
+
+    @property
+    def grid_length(self) -> int:
+        """Number of rows in grid"""
+        return self.lights.shape[0]
+
+    @property
+    def grid_width(self) -> int:
+        """Number of columns in grid"""
+        return self.lights.shape[1]
+
+    @property
+    def light_status(self) -> List:
+        """Grid as rows of LightStatus values"""
+        symbols = np.array([LightStatus.OFF.value, LightStatus.ON.value])
+        return symbols[self.lights].tolist()
+
+    def _digest(self) -> bytes:
+        return self._hash(np.packbits(self.lights).tobytes())
+
+    def _packed_rows(self) -> List[int]:
+        packed = np.packbits(self.lights, axis=1, bitorder="little")
+        return [int.from_bytes(row, "little") for row in packed]
+
+    def _execute_one_step(self) -> None:
+        self.lights = next_generation(np.pad(self.lights, 1), self.rule_table)
+
+    def set_corners_on(self) -> None:
+        self.lights[np.ix_([0, -1], [0, -1])] = 1
+
+    def print_light_grid(self) -> None:
+        for row in self.light_status:
+            print("".join(row))
+
+    @property
+    def number_of_lights_on(self) -> int:
+        """Return number of lights on"""
+        return int(np.count_nonzero(self.lights))
+
+
+class TiledLightGrid(NumpyLightGrid):
+    """Light Grid that only recomputes tiles near lights that changed last step
+
+    Two padded buffers are swapped each step. A tile whose neighbourhood did not
+    change last step holds the same values in both buffers, so it can be skipped.
+    """
+
+    def __init__(
+        self, light_status: List, tile_size: int = 64, rule: LifeRule = CONWAY
+    ) -> None:
+        self.rule = rule
+        self.tile_size = tile_size
+        self.front = np.pad(self._to_array(light_status), 1)
+        self.back = self.front.copy()
+        tiles = (-(-self.grid_length // tile_size), -(-self.grid_width // tile_size))
+        self.changed_tiles = np.ones(tiles, dtype=bool)
+
+    @property
+    def lights(self) -> np.ndarray:
+        """Current generation, as a view of the front buffer without padding"""
+        return self.front[1:-1, 1:-1]
+
+    @property
+    def grid_length(self) -> int:
+        """Number of rows in grid"""
+        return self.front.shape[0] - 2
+
+    @property
+    def grid_width(self) -> int:
+        """Number of columns in grid"""
+        return self.front.shape[1] - 2
+
+    def _get_active_tiles(self) -> np.ndarray:
+        """Return mask of tiles that changed last step or border one that did"""
+        padded = np.pad(self.changed_tiles, 1)
+        length, width = self.changed_tiles.shape
+        active_tiles = np.zeros_like(self.changed_tiles)
+        for row_offset in range(3):
+            for column_offset in range(3):
+                active_tiles |= padded[
+                    row_offset : row_offset + length,
+                    column_offset : column_offset + width,
+                ]
+        return active_tiles
+
+    def _execute_one_step(self) -> None:
+        active_tiles = self._get_active_tiles()
+        rule_table = self.rule_table
+        self.changed_tiles = np.zeros_like(active_tiles)
+        for tile_row, tile_column in zip(*np.nonzero(active_tiles)):
+            top = tile_row * self.tile_size + 1
+            left = tile_column * self.tile_size + 1
+            bottom = min(top + self.tile_size, self.grid_length + 1)
+            right = min(left + self.tile_size, self.grid_width + 1)
+
+            new_tile = next_generation(
+                self.front[top - 1 : bottom + 1, left - 1 : right + 1], rule_table
+            )
+            current = self.front[top:bottom, left:right]
+            self.back[top:bottom, left:right] = new_tile
+            if not np.array_equal(new_tile, current):
+                self.changed_tiles[tile_row, tile_column] = True
+        self.front, self.back = self.back, self.front
+
+    def set_corners_on(self) -> None:
+        corner_tiles = np.ix_([0, -1], [0, -1])
+        self.changed_tiles[corner_tiles] |= self.lights[corner_tiles] == 0
+        self.lights[corner_tiles] = 1
@@ -0,0 +1,116 @@
+"""Multi-process Light Grid for Day 18"""
+
+import os
+from multiprocessing import Barrier, Process, shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from day_18 import CONWAY, LifeRule
+from day_18_numpy import NumpyLightGrid, next_generation
+
+
+def _step_rows(
+    source: np.ndarray,
+    target: np.ndarray,
+    band: Tuple[int, int],
+    rule_table: np.ndarray,
+) -> None:
+    """Write next generation of padded rows band[0] <= row < band[1] to target"""
+    top, bottom = band
+    width = source.shape[1] - 2
+    target[top:bottom, 1:-1] = next_generation(source[top - 1 : bottom + 1], rule_table)
+    for corner_row in (1, source.shape[0] - 2):
+        if top <= corner_row < bottom:
+            target[corner_row, [1, width]] = 1
+
+
+def _step_band(
+    shared_name: str,
+    shape: Tuple[int, int],
+    band: Tuple[int, int],
+    number_of_steps: int,
+    barrier: Barrier,
+    rule_table: bytes,
+) -> None:
+    """Advance padded rows band[0] <= row < band[1] in step with the other workers
+    Generations alternate between two zero padded buffers in shared memory, so the
+    rows either side of the band are read straight from the neighbouring bands.
+    A failing worker breaks the barrier, so the others stop instead of waiting forever
+    """
+    shared = shared_memory.SharedMemory(name=shared_name)
+    buffers = np.ndarray((2, *shape), dtype=np.uint8, buffer=shared.buf)
+    rule_table = np.frombuffer(rule_table, dtype=np.uint8)
+    try:
+        for step in range(number_of_steps):
+            _step_rows(buffers[step % 2], buffers[(step + 1) % 2], band, rule_table)
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        del buffers
+        shared.close()
+
+
+class ParallelLightGrid(NumpyLightGrid):
+    """Light Grid stepped by worker processes, each owning a horizontal band
+
+    The grid lives in multiprocessing.shared_memory for the whole run, so nothing
+    is pickled between steps; workers meet at a barrier after every generation.
+    """
+
+    def __init__(
+        self,
+        light_status: List,
+        processes: Optional[int] = None,
+        rule: LifeRule = CONWAY,
+    ) -> None:
+        super().__init__(light_status, rule)
+        self.processes = processes or os.cpu_count() or 1
+
+    def execute_steps(self, number_of_steps: int, detect_cycles: bool = False) -> None:
+        """Execute number of steps
+        detect_cycles steps in this process, as every generation must be inspected
+        """
+        if detect_cycles:
+            super().execute_steps(number_of_steps, detect_cycles)
+            return
+
+        self.set_corners_on()
+        shape = (self.grid_length + 2, self.grid_width + 2)
+        shared = shared_memory.SharedMemory(create=True, size=2 * shape[0] * shape[1])
+        try:
+            buffers = np.ndarray((2, *shape), dtype=np.uint8, buffer=shared.buf)
+            buffers.fill(0)
+            buffers[0, 1:-1, 1:-1] = self.lights
+
+            bands = min(self.processes, self.grid_length)
+            edges = [1 + self.grid_length * band // bands for band in range(bands + 1)]
+            barrier = Barrier(bands)
+            workers = [
+                Process(
+                    target=_step_band,
+                    args=(
+                        shared.name,
+                        shape,
+                        band,
+                        number_of_steps,
+                        barrier,
+                        self.rule.table,
+                    ),
+                )
+                for band in zip(edges, edges[1:])
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            if any(worker.exitcode for worker in workers):
+                raise RuntimeError("Light Grid worker process failed")
+
+            self.lights = buffers[number_of_steps % 2, 1:-1, 1:-1].copy()
+            del buffers
+        finally:
+            shared.close()
+            shared.unlink()
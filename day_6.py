@@ -1,13 +1,30 @@
 """Advent of Code 2015 Day 6"""
-from day_6_input import day_6_input
+import itertools
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
 from collections import namedtuple
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 Point = namedtuple("Point", ("x", "y"))
 
+COMMAND_PATTERN = re.compile(r"(toggle|on|off) (\d+),(\d+) through (\d+),(\d+)")
+COMMAND_FIELDS = 5  # action code, x0, y0, x1, y1
+GRID_BACKENDS = ("set", "bitset", "numpy", "difference")
+PROGRESS_INTERVAL = 100_000  # commands between progress callbacks
+CHECKPOINT_INTERVAL = 1_000_000  # commands between checkpoints during replay
+CHECKPOINT_MAGIC = b"D6CK"
+# magic, format, x size, y size, command offset (padded so payload is 8 byte aligned)
+CHECKPOINT_HEADER = struct.Struct("<4sBxxxIIQ")
+
 
 class CommandAction(Enum):
     on = auto()
@@ -15,6 +32,37 @@ class CommandAction(Enum):
     toggle = auto()
 
 
+class CheckpointFormat(Enum):
+    """Enumeration of Checkpoint Payload Layouts"""
+
+    PACKED_BITS = auto()  # y rows of ceil(x / 8) little endian bytes, bit x = light x
+    UINT8 = auto()  # one byte per light, index x * y_size + y
+    UINT32 = auto()  # one little endian uint32 per light, index x * y_size + y
+
+
+def _pack_rows(rows: Iterable[int], width: int) -> bytes:
+    """Return bit rows as PACKED_BITS checkpoint payload"""
+    row_length = (width + 7) // 8
+    return b"".join(row.to_bytes(row_length, "little") for row in rows)
+
+
+def _unpack_rows(buffer: memoryview, size: Tuple[int, int]) -> list:
+    """Return bit rows from PACKED_BITS checkpoint payload"""
+    width, height = size
+    row_length = (width + 7) // 8
+    return [
+        int.from_bytes(buffer[y * row_length : (y + 1) * row_length], "little")
+        for y in range(height)
+    ]
+
+
+def _swap_little_endian(values: array) -> array:
+    """Convert array between native and little endian byte order in place"""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
 @dataclass
 class LightCommand:
     """Representation of a Command for LightGrid"""
@@ -22,6 +70,45 @@ class LightCommand:
     end_point: Point
     action: CommandAction = None
 
+class RegionIndex:
+    """Summed-area table answering rectangle totals of a grid in O(1)"""
+
+    def __init__(self, size: Tuple[int, int], values: Iterable[Tuple[Point, int]]):
+        self.x, self.y = size
+        self.stride = self.y + 1
+        cells = array("Q", bytes(8 * self.x * self.y))
+        for light_position, value in values:
+            cells[light_position.x * self.y + light_position.y] = value
+
+        # table[(x + 1) * stride + (y + 1)] = total of all cells up to (x, y) inclusive
+        self.table = array("Q", bytes(8 * (self.x + 1) * self.stride))
+        for x in range(self.x):
+            running_total = 0
+            previous = x * self.stride
+            current = previous + self.stride
+            for y in range(self.y):
+                running_total += cells[x * self.y + y]
+                self.table[current + y + 1] = (
+                    self.table[previous + y + 1] + running_total
+                )
+
+    def query(self, start: Point, end: Point) -> int:
+        """Return total over rectangle from start to end inclusive"""
+        x0, x1 = sorted((start.x, end.x))
+        y0, y1 = sorted((start.y, end.y))
+        table, stride = self.table, self.stride
+        return (
+            table[(x1 + 1) * stride + y1 + 1]
+            - table[x0 * stride + y1 + 1]
+            - table[(x1 + 1) * stride + y0]
+            + table[x0 * stride + y0]
+        )
+
+    def query_many(self, rectangles: Iterable[Tuple[Point, Point]]) -> List[int]:
+        """Return totals over each (start, end) rectangle"""
+        return [self.query(start, end) for start, end in rectangles]
+
+
 class LightGridv2:
     """Representation of a Grid of Lights"""
 
@@ -54,6 +141,31 @@ class LightGridv2:
         """Return number of lights currently on"""
         return sum(self.lights_on.values())
 
+    def build_region_index(self) -> RegionIndex:
+        """Return index answering total brightness in any rectangle"""
+        return RegionIndex((self.x, self.y), self.lights_on.items())
+
+    CHECKPOINT_FORMAT = CheckpointFormat.UINT32
+
+    def to_checkpoint(self) -> bytes:
+        """Return grid state as checkpoint payload"""
+        brightness = array("I", bytes(4 * self.x * self.y))
+        for light_position, value in self.lights_on.items():
+            brightness[light_position.x * self.y + light_position.y] = value
+        return _swap_little_endian(brightness).tobytes()
+
+    @classmethod
+    def from_checkpoint(cls, size: Tuple[int, int], buffer: memoryview):
+        """Return grid restored from checkpoint payload"""
+        grid = cls(size)
+        brightness = array("I")
+        brightness.frombytes(buffer[: 4 * grid.x * grid.y])
+        _swap_little_endian(brightness)
+        for index, value in enumerate(brightness):
+            if value:
+                grid.lights_on[Point(*divmod(index, grid.y))] = value
+        return grid
+
 
 
 class LightGrid:
@@ -83,7 +195,106 @@ class LightGrid:
         """Return number of lights currently on"""
         return len(self.lights_on)
 
+    def build_region_index(self) -> RegionIndex:
+        """Return index answering number of lights on in any rectangle"""
+        return RegionIndex((self.x, self.y), ((light, 1) for light in self.lights_on))
+
+    CHECKPOINT_FORMAT = CheckpointFormat.PACKED_BITS
+
+    def to_checkpoint(self) -> bytes:
+        """Return grid state as checkpoint payload"""
+        rows = [0] * self.y
+        for light_position in self.lights_on:
+            rows[light_position.y] |= 1 << light_position.x
+        return _pack_rows(rows, self.x)
+
+    @classmethod
+    def from_checkpoint(cls, size: Tuple[int, int], buffer: memoryview):
+        """Return grid restored from checkpoint payload"""
+        grid = cls(size)
+        for y, row in enumerate(_unpack_rows(buffer, size)):
+            while row:
+                lowest_bit = row & -row
+                grid.lights_on.add(Point(lowest_bit.bit_length() - 1, y))
+                row ^= lowest_bit
+        return grid
+
+
+
+
+class PackedLightGrid:
+    """Representation of a Grid of Lights packed as one bit per light
+    Each row is a Python int with bit x set when light (x, row) is on
+    """
+
+    def __init__(self, size: Tuple[int, int]):
+        self.x, self.y = size
+        self.rows = [0] * self.y
+
+    @staticmethod
+    def _row_mask(start_x: int, end_x: int) -> int:
+        """Return mask with bits start_x to end_x inclusive set"""
+        return ((1 << (end_x - start_x + 1)) - 1) << start_x
+
+    def switch_on_region(self, start: Point, end: Point):
+        """Switch on all lights in rectangle from start to end"""
+        mask = self._row_mask(start.x, end.x)
+        for y in range(start.y, end.y + 1):
+            self.rows[y] |= mask
+
+    def switch_off_region(self, start: Point, end: Point):
+        """Switch off all lights in rectangle from start to end"""
+        mask = ~self._row_mask(start.x, end.x)
+        for y in range(start.y, end.y + 1):
+            self.rows[y] &= mask
+
+    def toggle_region(self, start: Point, end: Point):
+        """Toggle all lights in rectangle from start to end"""
+        mask = self._row_mask(start.x, end.x)
+        for y in range(start.y, end.y + 1):
+            self.rows[y] ^= mask
+
+    def switch_on_light(self, light_position:Point):
+        """Switch on light at position light_position"""
+        self.switch_on_region(light_position, light_position)
+
+    def switch_off_light(self, light_position:Point):
+        """Switch off light at position light_position"""
+        self.switch_off_region(light_position, light_position)
 
+    def toggle_light(self, light_position:Point):
+        """Toggle light at position light_position"""
+        self.toggle_region(light_position, light_position)
+
+    @property
+    def number_of_lights_on(self):
+        """Return number of lights currently on"""
+        return sum(row.bit_count() for row in self.rows)
+
+    def build_region_index(self) -> RegionIndex:
+        """Return index answering number of lights on in any rectangle"""
+        return RegionIndex(
+            (self.x, self.y),
+            (
+                (Point(x, y), 1)
+                for y, row in enumerate(self.rows)
+                for x in range(self.x)
+                if row >> x & 1
+            ),
+        )
+
+    CHECKPOINT_FORMAT = CheckpointFormat.PACKED_BITS
+
+    def to_checkpoint(self) -> bytes:
+        """Return grid state as checkpoint payload"""
+        return _pack_rows(self.rows, self.x)
+
+    @classmethod
+    def from_checkpoint(cls, size: Tuple[int, int], buffer: memoryview):
+        """Return grid restored from checkpoint payload"""
+        grid = cls(size)
+        grid.rows = _unpack_rows(buffer, size)
+        return grid
 
 
 class LightController:
@@ -94,6 +305,101 @@ class LightController:
         command = self._parse_command(command)
         self._do_action(command,grid)
 
+    def execute_commands(self, commands: array, grid: LightGrid):
+        """Implement every Command in a parsed command array on Grid"""
+        for index in range(len(commands) // COMMAND_FIELDS):
+            self._do_action(self.unpack_command(commands, index), grid)
+
+    def execute_stream(
+        self,
+        source: Union[str, os.PathLike, Iterable[str]],
+        *grids: LightGrid,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ) -> int:
+        """Read, parse and implement each Command from source on every Grid in turn
+        source is a command file path or any iterable of command lines (e.g. sys.stdin)
+        progress is called every PROGRESS_INTERVAL commands with (count, commands/s)
+        Returns number of commands executed
+        """
+        count = 0
+        start_time = time.perf_counter()
+        for count, command in enumerate(self.iter_commands(source), 1):
+            for grid in grids:
+                self._do_action(command, grid)
+            if progress and count % PROGRESS_INTERVAL == 0:
+                progress(count, count / (time.perf_counter() - start_time))
+        return count
+
+    def replay(
+        self,
+        source: Union[str, os.PathLike, Iterable[str]],
+        grid_class: type,
+        size: Tuple[int, int],
+        checkpoint_path: Union[str, os.PathLike],
+        checkpoint_every: int = CHECKPOINT_INTERVAL,
+        progress: Optional[Callable[[int, float], None]] = None,
+    ):
+        """Replay Commands from source onto a new Grid, checkpointing as it goes
+        Resumes from checkpoint_path if it exists, skipping commands it already covers
+        Returns the final Grid
+        """
+        if os.path.exists(checkpoint_path):
+            grid, offset = load_checkpoint(checkpoint_path, grid_class)
+        else:
+            grid, offset = grid_class(size), 0
+
+        start_offset = offset
+        start_time = time.perf_counter()
+        lines = itertools.islice(self._iter_command_lines(source), offset, None)
+        for offset, line in enumerate(lines, offset + 1):
+            self._do_action(self._parse_command(line), grid)
+            if offset % checkpoint_every == 0:
+                save_checkpoint(checkpoint_path, grid, offset)
+            if progress and (offset - start_offset) % PROGRESS_INTERVAL == 0:
+                rate = (offset - start_offset) / (time.perf_counter() - start_time)
+                progress(offset, rate)
+        save_checkpoint(checkpoint_path, grid, offset)
+        return grid
+
+    @classmethod
+    def iter_commands(
+        cls, source: Union[str, os.PathLike, Iterable[str]]
+    ) -> Iterator[LightCommand]:
+        """Lazily yield parsed LightCommands from a command file path or lines"""
+        for line in cls._iter_command_lines(source):
+            yield cls._parse_command(line)
+
+    @staticmethod
+    def _iter_command_lines(
+        source: Union[str, os.PathLike, Iterable[str]]
+    ) -> Iterator[str]:
+        """Lazily yield non blank lines from a command file path or iterable of lines"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "r", encoding="utf-8") as filehandle:
+                yield from LightController._iter_command_lines(filehandle)
+            return
+        for line in source:
+            if line.strip():
+                yield line
+
+    @staticmethod
+    def parse_commands(commands: str) -> array:
+        """Translate block of Human Readable Commands to a flat command array
+        Layout: COMMAND_FIELDS unsigned ints per command (action code, x0, y0, x1, y1)
+        """
+        parsed_commands = array("L")
+        for action, *coordinates in COMMAND_PATTERN.findall(commands):
+            parsed_commands.append(CommandAction[action].value)
+            parsed_commands.extend(map(int, coordinates))
+        return parsed_commands
+
+    @staticmethod
+    def unpack_command(commands: array, index: int) -> LightCommand:
+        """Return LightCommand stored at index of a parsed command array"""
+        offset = index * COMMAND_FIELDS
+        action, x0, y0, x1, y1 = commands[offset : offset + COMMAND_FIELDS]
+        return LightCommand(Point(x0, y0), Point(x1, y1), CommandAction(action))
+
     @staticmethod
     def _parse_command(command: str):
         """Translate Human Readable to Computer Readable Command"""
@@ -127,6 +433,18 @@ class LightController:
         y_parameters = [command.start_point.y,command.end_point.y]
         y_parameters.sort()
 
+        if hasattr(grid, "switch_on_region"):
+            start = Point(x_parameters[0], y_parameters[0])
+            end = Point(x_parameters[1], y_parameters[1])
+            match command.action:
+                case CommandAction.on:
+                    grid.switch_on_region(start, end)
+                case CommandAction.off:
+                    grid.switch_off_region(start, end)
+                case CommandAction.toggle:
+                    grid.toggle_region(start, end)
+            return
+
         for x in range(x_parameters[0],x_parameters[1]+1):
             for y in range(y_parameters[0],y_parameters[1]+1):
                 match command.action:
@@ -143,20 +461,128 @@ class LightController:
         
 
 
-def main():
-    """Main Function"""
-    my_lights = LightGrid((1000, 1000))
+def save_checkpoint(path: Union[str, os.PathLike], grid, offset: int):
+    """Atomically write grid state and command offset to a binary checkpoint file"""
+    header = CHECKPOINT_HEADER.pack(
+        CHECKPOINT_MAGIC, grid.CHECKPOINT_FORMAT.value, grid.x, grid.y, offset
+    )
+    temporary_path = f"{os.fspath(path)}.tmp"
+    with open(temporary_path, "wb") as filehandle:
+        filehandle.write(header)
+        filehandle.write(grid.to_checkpoint())
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path: Union[str, os.PathLike], grid_class: type):
+    """Return (grid, command offset) restored from a binary checkpoint file
+    The file is memory mapped copy-on-write, so array backed grids share its pages
+    """
+    with open(path, "rb") as filehandle:
+        checkpoint = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, checkpoint_format, x, y, offset = CHECKPOINT_HEADER.unpack_from(checkpoint)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError(f"{path} is not a Day 6 checkpoint")
+    if CheckpointFormat(checkpoint_format) is not grid_class.CHECKPOINT_FORMAT:
+        raise ValueError(
+            f"{path} holds {CheckpointFormat(checkpoint_format).name} state, "
+            f"not {grid_class.CHECKPOINT_FORMAT.name}"
+        )
+    payload = memoryview(checkpoint)[CHECKPOINT_HEADER.size :]
+    return grid_class.from_checkpoint((x, y), payload), offset
+
+
+def _execute_band(
+    commands: array, grid_class: type, width: int, band: Tuple[int, int]
+) -> int:
+    """Execute parsed commands clipped to rows band[0] <= y < band[1]
+    Returns number of lights on, or total brightness for brightness grids
+    """
+    band_start, band_stop = band
+    grid = grid_class((width, band_stop - band_start))
+    for index in range(len(commands) // COMMAND_FIELDS):
+        command = LightController.unpack_command(commands, index)
+        start_y = max(min(command.start_point.y, command.end_point.y), band_start)
+        end_y = min(max(command.start_point.y, command.end_point.y), band_stop - 1)
+        if start_y > end_y:
+            continue
+        command.start_point = Point(command.start_point.x, start_y - band_start)
+        command.end_point = Point(command.end_point.x, end_y - band_start)
+        LightController._do_action(command, grid)
+    if hasattr(grid, "total_brightness"):
+        return grid.total_brightness
+    return grid.number_of_lights_on
+
+
+def execute_tiled(
+    commands: array,
+    grid_class: type,
+    size: Tuple[int, int],
+    bands: Optional[int] = None,
+) -> int:
+    """Execute parsed commands on a grid split into horizontal bands, one per process
+    Returns number of lights on, or total brightness for brightness grids
+    """
+    width, height = size
+    bands = min(bands or os.cpu_count() or 1, height)
+    edges = [height * band // bands for band in range(bands + 1)]
+    with ProcessPoolExecutor(max_workers=bands) as executor:
+        band_totals = executor.map(
+            _execute_band,
+            [commands] * bands,
+            [grid_class] * bands,
+            [width] * bands,
+            zip(edges, edges[1:]),
+        )
+        return sum(band_totals)
+
+
+def get_grid_classes(backend: str):
+    """Return (on/off grid, brightness grid) classes for named backend"""
+    match backend:
+        case "numpy":
+            from day_6_numpy import NumpyLightGrid, NumpyLightGridv2
+
+            return NumpyLightGrid, NumpyLightGridv2
+        case "difference":
+            from day_6_numpy import DifferenceLightGridv2, NumpyLightGrid
+
+            return NumpyLightGrid, DifferenceLightGridv2
+        case "bitset":
+            return PackedLightGrid, LightGridv2
+        case "set":
+            return LightGrid, LightGridv2
+    raise ValueError(f"Unknown grid backend: {backend}")
+
+
+def report_progress(count: int, rate: float):
+    """Print streaming progress to stderr"""
+    print(f"{count} commands ({rate:.0f} commands/s)", file=sys.stderr)
+
+
+def main(backend: str = "set", source: Optional[str] = None):
+    """Main Function
+    source is a command file path, "-" for stdin, or None for the embedded puzzle input
+    """
+    grid_class, grid_class_v2 = get_grid_classes(backend)
+    my_lights = grid_class((1000, 1000))
+    my_lights_v2 = grid_class_v2((1000,1000))
     my_light_controller = LightController()
-    commands = day_6_input.splitlines()
-    for command in commands:
-        my_light_controller.execute_command(command, my_lights)
+    if source is None:
+        from day_6_input import day_6_input
+
+        commands = my_light_controller.parse_commands(day_6_input)
+        my_light_controller.execute_commands(commands, my_lights)
+        my_light_controller.execute_commands(commands, my_lights_v2)
+    else:
+        my_light_controller.execute_stream(
+            sys.stdin if source == "-" else source,
+            my_lights,
+            my_lights_v2,
+            progress=report_progress,
+        )
     print(f"{my_lights.number_of_lights_on} lights on at end of sequence")
-
-    my_lights_v2 = LightGridv2((1000,1000))
-    for command in commands:
-        my_light_controller.execute_command(command, my_lights_v2)
     print(f"{my_lights_v2.total_brightness} total brightness")
 
 
 if __name__ == "__main__":
-    main()
+    main(*sys.argv[1:3])
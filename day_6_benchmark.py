@@ -0,0 +1,123 @@
+"""Benchmark Harness for Day 6 Grid Backends"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Sequence, Tuple
+
+from day_6 import GRID_BACKENDS, LightController, get_grid_classes
+
+
+def generate_commands(
+    path: str,
+    number_of_commands: int,
+    size: Tuple[int, int],
+    mix: Sequence[int] = (1, 1, 1),
+    seed: int = 0,
+):
+    """Write random command file with on/off/toggle weighted by mix"""
+    generator = random.Random(seed)
+    width, height = size
+    actions = generator.choices(
+        ["turn on", "turn off", "toggle"], weights=mix, k=number_of_commands
+    )
+    with open(path, "w", encoding="utf-8") as filehandle:
+        for action in actions:
+            x0, x1 = sorted(generator.randrange(width) for _ in range(2))
+            y0, y1 = sorted(generator.randrange(height) for _ in range(2))
+            filehandle.write(f"{action} {x0},{y0} through {x1},{y1}\n")
+
+
+def run_backend(backend: str, path: str, size: Tuple[int, int]) -> Dict:
+    """Replay command file through backend and return timings and results"""
+    grid_class, grid_class_v2 = get_grid_classes(backend)
+    lights, lights_v2 = grid_class(size), grid_class_v2(size)
+    start_time = time.perf_counter()
+    number_of_commands = LightController().execute_stream(path, lights, lights_v2)
+    number_of_lights_on = lights.number_of_lights_on
+    total_brightness = lights_v2.total_brightness
+    wall_time = time.perf_counter() - start_time
+    return {
+        "backend": backend,
+        "wall_time": wall_time,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "commands_per_second": number_of_commands / wall_time,
+        "number_of_lights_on": number_of_lights_on,
+        "total_brightness": total_brightness,
+    }
+
+
+def run_benchmark(
+    backends: Sequence[str], path: str, size: Tuple[int, int]
+) -> List[Dict]:
+    """Run each backend in a fresh process, so peak RSS is per backend"""
+    results = []
+    for backend in backends:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            results.append(executor.submit(run_backend, backend, path, size).result())
+    return results
+
+
+def results_agree(results: List[Dict]) -> bool:
+    """Return True if every backend produced identical answers"""
+    answers = {
+        (result["number_of_lights_on"], result["total_brightness"])
+        for result in results
+    }
+    return len(answers) <= 1
+
+
+def print_table(results: List[Dict]):
+    """Print benchmark results as a table"""
+    print(
+        f"{'backend':<12}{'wall time (s)':>15}{'peak RSS (MB)':>15}"
+        f"{'commands/s':>14}{'lights on':>12}{'brightness':>14}"
+    )
+    for result in results:
+        print(
+            f"{result['backend']:<12}{result['wall_time']:>15.3f}"
+            f"{result['peak_rss_kb'] / 1024:>15.1f}"
+            f"{result['commands_per_second']:>14.0f}"
+            f"{result['number_of_lights_on']:>12}{result['total_brightness']:>14}"
+        )
+
+
+def main():
+    """Main Function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=300)
+    parser.add_argument("--size", type=int, default=1000, help="grid width and height")
+    parser.add_argument(
+        "--mix", default="1,1,1", help="relative weights of on,off,toggle commands"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(GRID_BACKENDS))
+    parser.add_argument("--input", help="keep generated command file at this path")
+    parser.add_argument("--json", help="also write results to this JSON file")
+    arguments = parser.parse_args()
+
+    size = (arguments.size, arguments.size)
+    mix = [int(weight) for weight in arguments.mix.split(",")]
+    with tempfile.TemporaryDirectory() as directory:
+        path = arguments.input or os.path.join(directory, "commands.txt")
+        generate_commands(path, arguments.commands, size, mix, arguments.seed)
+        results = run_benchmark(arguments.backends.split(","), path, size)
+
+    print_table(results)
+    if arguments.json:
+        with open(arguments.json, "w", encoding="utf-8") as filehandle:
+            json.dump(results, filehandle, indent=4)
+    if not results_agree(results):
+        print("Backends disagree!", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""NumPy backed Light Grids for Day 6"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from day_6 import CheckpointFormat, CommandAction, LightCommand, Point
+
+
+class NumpyRegionIndex:
+    """Summed-area table answering rectangle totals of an array in O(1)"""
+
+    def __init__(self, values: np.ndarray):
+        self.table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), np.uint64)
+        values.cumsum(axis=0, dtype=np.uint64).cumsum(axis=1, out=self.table[1:, 1:])
+
+    def query(self, start: Point, end: Point) -> int:
+        """Return total over rectangle from start to end inclusive"""
+        return self.query_many([(start, end)])[0]
+
+    def query_many(self, rectangles) -> List[int]:
+        """Return totals over each (start, end) rectangle
+        rectangles may be a sequence of Point pairs or an (n, 2, 2) integer array
+        """
+        corners = np.asarray(rectangles, dtype=np.int64).reshape(-1, 2, 2)
+        x0, x1 = np.sort(corners[:, :, 0], axis=1).T
+        y0, y1 = np.sort(corners[:, :, 1], axis=1).T
+        table = self.table
+        totals = (
+            table[x1 + 1, y1 + 1]
+            - table[x0, y1 + 1]
+            - table[x1 + 1, y0]
+            + table[x0, y0]
+        )
+        return totals.tolist()
+
+
+class NumpyGrid:
+    """Grid of Lights held as an array (ABSTRACT)"""
+
+    CHECKPOINT_FORMAT: CheckpointFormat
+    dtype: np.dtype
+
+    def __init__(self, size: Tuple[int, int], lights: np.ndarray = None):
+        self.x, self.y = size
+        if lights is None:
+            lights = np.zeros((self.x, self.y), dtype=self.dtype)
+        self.lights = lights
+
+    def to_checkpoint(self) -> np.ndarray:
+        """Return grid state as checkpoint payload"""
+        return np.ascontiguousarray(self.lights, dtype=self.dtype.newbyteorder("<"))
+
+    @classmethod
+    def from_checkpoint(cls, size: Tuple[int, int], buffer: memoryview):
+        """Return grid viewing checkpoint payload in place, without copying"""
+        lights = np.frombuffer(
+            buffer, dtype=cls.dtype.newbyteorder("<"), count=size[0] * size[1]
+        )
+        return cls(size, lights.reshape(size))
+
+    def build_region_index(self) -> "NumpyRegionIndex":
+        """Return index answering rectangle totals of the grid"""
+        return NumpyRegionIndex(self.lights)
+
+    @staticmethod
+    def _region(start: Point, end: Point) -> Tuple[slice, slice]:
+        """Return array slices covering rectangle from start to end inclusive"""
+        return slice(start.x, end.x + 1), slice(start.y, end.y + 1)
+
+
+class NumpyLightGrid(NumpyGrid):
+    """Representation of a Grid of Lights held as a uint8 array"""
+
+    CHECKPOINT_FORMAT = CheckpointFormat.UINT8
+    dtype = np.dtype(np.uint8)
+
+    def switch_on_region(self, start: Point, end: Point):
+        """Switch on all lights in rectangle from start to end"""
+        self.lights[self._region(start, end)] = 1
+
+    def switch_off_region(self, start: Point, end: Point):
+        """Switch off all lights in rectangle from start to end"""
+        self.lights[self._region(start, end)] = 0
+
+    def toggle_region(self, start: Point, end: Point):
+        """Toggle all lights in rectangle from start to end"""
+        self.lights[self._region(start, end)] ^= 1
+
+    @property
+    def number_of_lights_on(self):
+        """Return number of lights currently on"""
+        return int(np.count_nonzero(self.lights))
+
+
+class NumpyLightGridv2(NumpyGrid):
+    """Representation of a Grid of Lights held as a uint32 brightness array"""
+
+    CHECKPOINT_FORMAT = CheckpointFormat.UINT32
+    dtype = np.dtype(np.uint32)
+
+    def switch_on_region(self, start: Point, end: Point):
+        """Increase brightness of all lights in rectangle by 1"""
+        self.lights[self._region(start, end)] += 1
+
+    def switch_off_region(self, start: Point, end: Point):
+        """Decrease brightness of all lights in rectangle by 1, to a minimum of 0"""
+        region = self.lights[self._region(start, end)]
+        np.subtract(region, 1, out=region, where=region > 0)
+
+    def toggle_region(self, start: Point, end: Point):
+        """Increase brightness of all lights in rectangle by 2"""
+        self.lights[self._region(start, end)] += 2
+
+    @property
+    def total_brightness(self):
+        """Return total brightness of all lights"""
+        return int(self.lights.sum(dtype=np.uint64))
+
+
+class DifferenceLightGridv2(NumpyLightGridv2):
+    """Brightness Grid that defers runs of on/toggle commands until an off needs them
+
+    Increases commute, so they are only recorded as pending rectangles. An off command
+    applies them first when its rectangle overlaps them, either one slice at a time or
+    through a 2D difference array over their bounding box, whichever is cheaper.
+    """
+
+    DIFFERENCE_CELL_COST = 16  # slice additions costing as much as one difference cell
+
+    def __init__(self, size: Tuple[int, int], lights: np.ndarray = None):
+        super().__init__(size, lights)
+        self.pending = []  # (start, end, amount) increases not yet applied
+        self.pending_area = 0
+        self.pending_box = None  # (start, end) bounding all pending increases
+
+    @property
+    def has_pending(self) -> bool:
+        """Return True if increases are waiting to be applied"""
+        return bool(self.pending)
+
+    def _add_region(self, start: Point, end: Point, amount: int):
+        """Record brightness increase over rectangle from start to end"""
+        self.pending.append((start, end, amount))
+        self.pending_area += (end.x - start.x + 1) * (end.y - start.y + 1)
+        if self.pending_box is None:
+            self.pending_box = (start, end)
+        else:
+            box_start, box_end = self.pending_box
+            self.pending_box = (
+                Point(min(box_start.x, start.x), min(box_start.y, start.y)),
+                Point(max(box_end.x, end.x), max(box_end.y, end.y)),
+            )
+
+    def _overlaps_pending(self, start: Point, end: Point) -> bool:
+        """Return True if rectangle from start to end meets any pending increase"""
+        if self.pending_box is None:
+            return False
+        box_start, box_end = self.pending_box
+        return (
+            start.x <= box_end.x
+            and box_start.x <= end.x
+            and start.y <= box_end.y
+            and box_start.y <= end.y
+        )
+
+    def materialize(self):
+        """Apply all pending increases to the brightness array"""
+        if not self.pending:
+            return
+        box_start, box_end = self.pending_box
+        box_x = box_end.x - box_start.x + 1
+        box_y = box_end.y - box_start.y + 1
+        if self.pending_area <= self.DIFFERENCE_CELL_COST * box_x * box_y:
+            for start, end, amount in self.pending:
+                self.lights[self._region(start, end)] += amount
+        else:
+            corners = np.array(
+                [
+                    (start.x, start.y, end.x + 1, end.y + 1, amount)
+                    for start, end, amount in self.pending
+                ],
+                dtype=np.int64,
+            )
+            corners[:, :4] -= (box_start.x, box_start.y, box_start.x, box_start.y)
+            x0, y0, x1, y1, amount = corners.T
+            difference = np.zeros((box_x + 1, box_y + 1), dtype=np.int64)
+            np.add.at(difference, (x0, y0), amount)
+            np.add.at(difference, (x0, y1), -amount)
+            np.add.at(difference, (x1, y0), -amount)
+            np.add.at(difference, (x1, y1), amount)
+            increase = difference.cumsum(axis=0).cumsum(axis=1)[:box_x, :box_y]
+            self.lights[self._region(box_start, box_end)] += increase.astype(np.uint32)
+        self.pending.clear()
+        self.pending_area = 0
+        self.pending_box = None
+
+    def to_checkpoint(self) -> np.ndarray:
+        """Return grid state as checkpoint payload"""
+        self.materialize()
+        return super().to_checkpoint()
+
+    def build_region_index(self) -> "NumpyRegionIndex":
+        """Return index answering rectangle totals of the grid"""
+        self.materialize()
+        return super().build_region_index()
+
+    def switch_on_region(self, start: Point, end: Point):
+        """Increase brightness of all lights in rectangle by 1"""
+        self._add_region(start, end, 1)
+
+    def switch_off_region(self, start: Point, end: Point):
+        """Decrease brightness of all lights in rectangle by 1, to a minimum of 0"""
+        if self._overlaps_pending(start, end):
+            self.materialize()
+        super().switch_off_region(start, end)
+
+    def toggle_region(self, start: Point, end: Point):
+        """Increase brightness of all lights in rectangle by 2"""
+        self._add_region(start, end, 2)
+
+    @property
+    def total_brightness(self):
+        """Return total brightness of all lights"""
+        self.materialize()
+        return super().total_brightness
+
+
+class CompressedLightEvaluator:
+    """Evaluate Light Commands on a coordinate compressed grid
+
+    Rectangle edges from every command split the grid into cells that are always
+    switched together, so each compressed cell is weighted by the real area it covers.
+    Cost depends on the number of commands rather than the size of the grid.
+    """
+
+    def __init__(self, commands: List[LightCommand]):
+        x_edges = set()
+        y_edges = set()
+        for command in commands:
+            x_edges.update(self._edges(command.start_point.x, command.end_point.x))
+            y_edges.update(self._edges(command.start_point.y, command.end_point.y))
+        self.x_edges = np.array(sorted(x_edges), dtype=np.int64)
+        self.y_edges = np.array(sorted(y_edges), dtype=np.int64)
+        self.cell_areas = np.outer(np.diff(self.x_edges), np.diff(self.y_edges))
+
+        size = (max(len(self.x_edges) - 1, 0), max(len(self.y_edges) - 1, 0))
+        self.lights = NumpyLightGrid(size)
+        self.lights_v2 = NumpyLightGridv2(size)
+        for command in commands:
+            self._do_action(command)
+
+    @staticmethod
+    def _edges(first: int, second: int) -> Tuple[int, int]:
+        """Return half open boundaries of an inclusive range"""
+        return min(first, second), max(first, second) + 1
+
+    def _compress(self, command: LightCommand) -> Tuple[Point, Point]:
+        """Return compressed cell co-ordinates covered by command"""
+        x_start, x_stop = self._edges(command.start_point.x, command.end_point.x)
+        y_start, y_stop = self._edges(command.start_point.y, command.end_point.y)
+        x_start, x_stop = np.searchsorted(self.x_edges, (x_start, x_stop))
+        y_start, y_stop = np.searchsorted(self.y_edges, (y_start, y_stop))
+        return Point(x_start, y_start), Point(x_stop - 1, y_stop - 1)
+
+    def _do_action(self, command: LightCommand):
+        start, end = self._compress(command)
+        for grid in (self.lights, self.lights_v2):
+            match command.action:
+                case CommandAction.on:
+                    grid.switch_on_region(start, end)
+                case CommandAction.off:
+                    grid.switch_off_region(start, end)
+                case CommandAction.toggle:
+                    grid.toggle_region(start, end)
+
+    @property
+    def number_of_lights_on(self):
+        """Return number of lights on after all commands"""
+        return int((self.lights.lights * self.cell_areas).sum())
+
+    @property
+    def total_brightness(self):
+        """Return total brightness after all commands"""
+        return int((self.lights_v2.lights * self.cell_areas).sum())
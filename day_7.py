@@ -15,13 +15,9 @@ def main():
     wire_signal = my_circuit.get_wire_value(wire_name)
     print(f"Wire {wire_name} has a value of: {wire_signal}")
 
-    my_second_circuit = Circuit()
-    for instruction in puzzle_input.splitlines():
-        if instruction[-4:] == "-> b":
-            instruction = f"{wire_signal} -> b"
-        my_second_circuit.add_gate(instruction)
+    my_circuit.override_wire("b", wire_signal)
 
-    wire_signal = my_second_circuit.get_wire_value(wire_name)
+    wire_signal = my_circuit.get_wire_value(wire_name)
     print(f"Wire {wire_name} has a value of: {wire_signal}")
 
 
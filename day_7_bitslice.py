@@ -0,0 +1,109 @@
+"""Bit-sliced evaluation of Day 7 Circuits, using only the standard library
+
+A batch of samples is held as 16 bit planes, one Python int per bit of the signal:
+bit j of plane k is bit k of sample j. AND, OR and NOT then act on every sample with
+one big-int operation per plane, and shifts just move planes to other bit positions.
+"""
+
+import random
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from day_7_circuit import Circuit
+from day_7_gates import GateType, LogicGate
+
+SIGNAL_BITS = 16
+
+Planes = Tuple[int, ...]
+
+
+def to_planes(signals: Sequence[int]) -> Planes:
+    """Return bit planes holding each signal as one sample"""
+    return tuple(
+        int("".join(str((signal >> bit) & 1) for signal in reversed(signals)) or "0", 2)
+        for bit in range(SIGNAL_BITS)
+    )
+
+
+def from_planes(planes: Planes, sample_count: int) -> List[int]:
+    """Return signal value of each sample held in bit planes"""
+    signals = [0] * sample_count
+    for bit, plane in enumerate(planes):
+        if not plane:
+            continue
+        weight = 1 << bit
+        for sample, digit in enumerate(reversed(format(plane, f"0{sample_count}b"))):
+            if digit == "1":
+                signals[sample] |= weight
+    return signals
+
+
+def constant_planes(signal: int, sample_count: int) -> Planes:
+    """Return bit planes holding the same signal in every sample"""
+    all_samples = (1 << sample_count) - 1
+    return tuple(
+        all_samples if (signal >> bit) & 1 else 0 for bit in range(SIGNAL_BITS)
+    )
+
+
+def random_planes(sample_count: int, rng: random.Random = random) -> Planes:
+    """Return bit planes holding sample_count uniformly random signals"""
+    return tuple(rng.getrandbits(sample_count) for _ in range(SIGNAL_BITS))
+
+
+def evaluate_planes(
+    circuit: Circuit,
+    inputs: Dict[str, Planes],
+    sample_count: int,
+    output_names: Optional[Iterable[str]] = None,
+) -> Dict[str, Planes]:
+    """Evaluate circuit for sample_count input assignments held in bit planes
+    inputs maps wire names to bit planes, which override whatever drives those
+    wires. Returns output_names (every wire if None) to bit planes.
+    """
+    return circuit.evaluate_with(
+        inputs,
+        partial(_gate_output, all_samples=(1 << sample_count) - 1),
+        partial(constant_planes, sample_count=sample_count),
+        output_names,
+    )
+
+
+def evaluate_bitsliced(
+    circuit: Circuit,
+    inputs: Dict[str, Sequence[int]],
+    output_names: Optional[Iterable[str]] = None,
+) -> Dict[str, List[int]]:
+    """Evaluate circuit for a batch of input signal lists, all the same length
+    Only SIGNAL_BITS planes are kept, so NOT and LSHIFT results fit in 16 bits.
+    """
+    sample_count = len(next(iter(inputs.values()))) if inputs else 1
+    input_planes = {
+        wire_name: to_planes(signals) for wire_name, signals in inputs.items()
+    }
+    return {
+        wire_name: from_planes(planes, sample_count)
+        for wire_name, planes in evaluate_planes(
+            circuit, input_planes, sample_count, output_names
+        ).items()
+    }
+
+
+def _gate_output(gate: LogicGate, operands: List[Planes], all_samples: int) -> Planes:
+    """Return gate output bit planes computed across every sample"""
+    match gate.type:
+        case GateType.DIRECT:
+            return operands[0]
+        case GateType.NOT:
+            return tuple(plane ^ all_samples for plane in operands[0])
+        case GateType.AND:
+            return tuple(a & b for a, b in zip(operands[0], operands[1]))
+        case GateType.OR:
+            return tuple(a | b for a, b in zip(operands[0], operands[1]))
+        case GateType.LSHIFT:
+            places = min(gate.shift_places, SIGNAL_BITS)
+            return (0,) * places + operands[0][: SIGNAL_BITS - places]
+        case GateType.RSHIFT:
+            places = min(gate.shift_places, SIGNAL_BITS)
+            return operands[0][places:] + (0,) * places
+    raise ValueError(f"Unknown gate type: {gate.type}")
@@ -1,6 +1,11 @@
 """Circuit Emulation Module for Day 7"""
 
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
 from day_7_gates import (
+    GateType,
+    LogicGate,
     OneInputLogicGate,
     TwoInputLogicGate,
     GateDescription,
@@ -14,9 +19,24 @@ class Circuit:
     def __init__(self):
         self.wires = {}  # wire_name:signal_value
         self.gates = []
+        self.gates_by_output = {}  # wire_name:gate driving that wire
+        self.dependent_wires = {}  # wire_name:output names of gates reading that wire
+        self.overrides = {}  # wire_name:signal_value forced by override_wire
+        self._evaluation_order = None
+        self._order_index = {}  # wire_name:position of its gate in evaluation_order
+        self._gate_index = {}  # wire_name:position of its gate in gates
 
     def add_gate(self, instruction: str):
         """Add gate to circuit"""
+        new_gate = self._build_gate(instruction)
+        if new_gate.output.name not in self.gates_by_output:
+            self.gates_by_output[new_gate.output.name] = new_gate
+            self._gate_index[new_gate.output.name] = len(self.gates)
+        self.gates.append(new_gate)
+        self._evaluation_order = None
+
+    def _build_gate(self, instruction: str) -> LogicGate:
+        """Return gate for instruction with any constant inputs set"""
         new_gate_description = self._parse_instruction(instruction)
         new_gate = logic_gate_factory(new_gate_description)
         if new_gate_description.input_a.isdigit():
@@ -31,27 +51,287 @@ class Circuit:
             and isinstance(new_gate, TwoInputLogicGate)
         ):
             new_gate.input_b.signal = int(new_gate_description.input_b)
+        return new_gate
 
-        self.gates.append(new_gate)
+    @property
+    def evaluation_order(self) -> List[LogicGate]:
+        """Gates driving each wire in topological order (Kahn's algorithm)
+        Computed once and reused until another gate is added
+        """
+        if self._evaluation_order is not None:
+            return self._evaluation_order
+
+        gates = list(self.gates_by_output.values())
+        inputs_pending = {}  # output wire_name:number of driven inputs not yet ordered
+        self.dependent_wires = {}
+        for gate in gates:
+            inputs_pending[gate.output.name] = len(self._driven_inputs(gate))
+            for input_name in self._wire_inputs(gate):
+                self.dependent_wires.setdefault(input_name, set()).add(gate.output.name)
+
+        ready = deque(gate for gate in gates if inputs_pending[gate.output.name] == 0)
+        order = []
+        while ready:
+            gate = ready.popleft()
+            order.append(gate)
+            for dependent_wire in self.dependent_wires.get(gate.output.name, ()):
+                inputs_pending[dependent_wire] -= 1
+                if inputs_pending[dependent_wire] == 0:
+                    ready.append(self.gates_by_output[dependent_wire])
+
+        if len(order) != len(gates):
+            raise ValueError("Circuit contains a feedback loop")
+        self._evaluation_order = order
+        self._order_index = {
+            gate.output.name: index for index, gate in enumerate(order)
+        }
+        return order
+
+    def _driven_inputs(self, gate: LogicGate) -> set:
+        """Return names of gate inputs that are driven by another gate"""
+        return {
+            input_name
+            for input_name in gate.input_names
+            if input_name in self.gates_by_output
+        }
+
+    @staticmethod
+    def _wire_inputs(gate: LogicGate) -> set:
+        """Return names of gate inputs that are wires rather than constants"""
+        return {
+            input_name for input_name in gate.input_names if not input_name.isdigit()
+        }
+
+    def evaluate(self) -> Dict[str, int]:
+        """Compute signal value of every wire in one pass, in topological order"""
+        for gate in self.evaluation_order:
+            if gate.output.name not in self.wires:
+                self._compute(gate)
+        return self.wires
+
+    def _compute(self, gate: LogicGate) -> None:
+        """Compute gate output from the current wire signals and store it"""
+        gate.set_inputs(self._input_signals(gate))
+        gate.compute_output()
+        self.wires[gate.output.name] = gate.output.signal
+
+    def _input_signals(self, gate: LogicGate) -> Dict[str, int]:
+        """Return current signal of every wire gate reads"""
+        signals = {}
+        for input_name in gate.input_names:
+            if input_name.isdigit():
+                continue
+            if input_name not in self.wires:
+                raise ValueError(f"Wire {input_name} is not driven by any gate")
+            signals[input_name] = self.wires[input_name]
+        return signals
+
+    def _upstream_order(self, wire_name: str) -> List[LogicGate]:
+        """Gates wire_name needs that have not been evaluated, in topological order
+        Found depth first with an explicit stack, so long chains cannot overflow
+        """
+        order = []
+        ordered = {}  # wire_name:True once ordered, False while its inputs are
+        stack = [(wire_name, False)]
+        while stack:
+            name, inputs_ordered = stack.pop()
+            if inputs_ordered:
+                ordered[name] = True
+                order.append(self.gates_by_output[name])
+                continue
+            if name in self.wires or ordered.get(name):
+                continue
+            if name in ordered:
+                raise ValueError("Circuit contains a feedback loop")
+            gate = self.gates_by_output.get(name)
+            if gate is None:
+                raise ValueError(f"Wire {name} is not driven by any gate")
+            ordered[name] = False
+            stack.append((name, True))
+            for input_name in gate.input_names:
+                if not input_name.isdigit():
+                    stack.append((input_name, False))
+        return order
+
+    def override_wire(self, wire_name: str, signal: int) -> None:
+        """Force wire to signal, updating only the wires downstream of it"""
+        self.overrides[wire_name] = signal
+        self._update_downstream(wire_name)
+
+    def replace_gate(self, instruction: str) -> None:
+        """Redefine the gate driving a wire, updating only the wires downstream of it
+        Raises ValueError, leaving the circuit unchanged, if that would form a loop
+        """
+        new_gate = self._build_gate(instruction)
+        wire_name = new_gate.output.name
+        old_gate = self.gates_by_output.get(wire_name)
+        if old_gate is None:
+            self.add_gate(instruction)
+            return
+        self.evaluation_order  # pylint: disable=pointless-statement
+        if self._driven_inputs(new_gate) & self._downstream_cone(wire_name):
+            raise ValueError("Circuit contains a feedback loop")
+
+        self.gates[self._gate_index[wire_name]] = new_gate
+        self.gates_by_output[wire_name] = new_gate
+        self.overrides.pop(wire_name, None)
+        for input_name in self._wire_inputs(old_gate):
+            self.dependent_wires[input_name].discard(wire_name)
+        for input_name in self._wire_inputs(new_gate):
+            self.dependent_wires.setdefault(input_name, set()).add(wire_name)
+        position = self._order_index[wire_name]
+        if all(
+            self._order_index[input_name] < position
+            for input_name in self._driven_inputs(new_gate)
+        ):
+            self._evaluation_order[position] = new_gate
+        else:
+            self._evaluation_order = None  # new inputs come later: reorder
+        self._update_downstream(wire_name)
+
+    def _downstream_cone(self, wire_name: str) -> set:
+        """Return wire_name and every wire that depends on it"""
+        cone = {wire_name}
+        pending = [wire_name]
+        while pending:
+            for dependent_wire in self.dependent_wires.get(pending.pop(), ()):
+                if dependent_wire not in cone:
+                    cone.add(dependent_wire)
+                    pending.append(dependent_wire)
+        return cone
+
+    def _update_downstream(self, wire_name: str) -> None:
+        """Bring every evaluated wire downstream of wire_name up to date
+        Wires are visited in topological order (wires no gate drives first). Each one
+        already evaluated is recomputed, or forgotten if one of its inputs is not
+        known yet, so it is computed afresh when next asked for. Wires outside the
+        cone keep their current signal values.
+        """
+        self.evaluation_order  # pylint: disable=pointless-statement
+        cone = self._downstream_cone(wire_name)
+        for cone_wire in sorted(cone, key=lambda name: self._order_index.get(name, -1)):
+            if cone_wire in self.overrides:
+                self.wires[cone_wire] = self.overrides[cone_wire]
+                continue
+            if cone_wire not in self.wires:
+                continue
+            gate = self.gates_by_output[cone_wire]
+            if all(name in self.wires for name in self._wire_inputs(gate)):
+                self._compute(gate)
+            else:
+                del self.wires[cone_wire]
+
+    def compile(
+        self,
+        input_names: Iterable[str] = (),
+        output_names: Optional[Iterable[str]] = None,
+    ) -> Callable[..., Dict[str, int]]:
+        """Compile the netlist into one straight-line Python function
+        The function takes one positional signal per wire in input_names, which
+        overrides whatever drives that wire, and returns a dict of output_names
+        (every wire if None) to signal values. Local variables stand in for wires,
+        in topological order, so no gate objects are touched when it runs.
+        """
+        input_names = list(input_names)
+        local_names = {
+            wire_name: f"input_{index}" for index, wire_name in enumerate(input_names)
+        }
+        lines = [f"def compiled_circuit({', '.join(local_names.values())}):"]
+        for index, gate in enumerate(self.evaluation_order):
+            wire_name = gate.output.name
+            if wire_name in local_names:
+                continue
+            expression = self._gate_expression(gate, local_names)
+            local_names[wire_name] = f"wire_{index}"
+            lines.append(f"    wire_{index} = {expression}")
+
+        if output_names is None:
+            output_names = local_names
+        outputs = ", ".join(f"{name!r}: {local_names[name]}" for name in output_names)
+        lines.append(f"    return {{{outputs}}}")
+
+        namespace = {}
+        exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+        return namespace["compiled_circuit"]
+
+    def evaluate_with(
+        self,
+        inputs: Dict[str, Any],
+        gate_output: Callable[[LogicGate, List[Any]], Any],
+        constant: Callable[[int], Any],
+        output_names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """Walk the netlist in topological order with signals of any representation
+        inputs maps wire names to signals, which override whatever drives those wires.
+        gate_output(gate, operands) returns a gate's output signal from its operand
+        signals, and constant(value) the signal of a constant input. Returns
+        output_names (every wire if None) to signals. Any other signal is released
+        after the last gate reading it, so large signals such as batches of samples
+        are only held while they are still needed.
+        """
+        wires = dict(inputs)
+        gates = [
+            gate for gate in self.evaluation_order if gate.output.name not in wires
+        ]
+        keep = set(wires if output_names is None else output_names)
+        last_reader = {}  # wire_name:index of last gate reading that wire
+        for index, gate in enumerate(gates):
+            for input_name in gate.input_names:
+                last_reader[input_name] = index
+
+        for index, gate in enumerate(gates):
+            operands = []
+            for input_name in gate.input_names:
+                if input_name.isdigit():
+                    operands.append(constant(int(input_name)))
+                elif input_name in wires:
+                    operands.append(wires[input_name])
+                else:
+                    raise ValueError(f"Wire {input_name} is not driven by any gate")
+            wires[gate.output.name] = gate_output(gate, operands)
+            if output_names is None:
+                keep.add(gate.output.name)
+            for input_name in gate.input_names:
+                if last_reader[input_name] == index and input_name not in keep:
+                    wires.pop(input_name, None)
+
+        if output_names is None:
+            return wires
+        return {wire_name: wires[wire_name] for wire_name in output_names}
+
+    @staticmethod
+    def _gate_expression(gate: LogicGate, local_names: Dict[str, str]) -> str:
+        """Return Python expression computing gate output from local variables"""
+        operands = []
+        for input_name in gate.input_names:
+            if input_name.isdigit():
+                operands.append(input_name)
+            elif input_name in local_names:
+                operands.append(local_names[input_name])
+            else:
+                raise ValueError(f"Wire {input_name} is not driven by any gate")
+        match gate.type:
+            case GateType.DIRECT:
+                return operands[0]
+            case GateType.NOT:
+                return f"~{operands[0]}"
+            case GateType.AND:
+                return f"{operands[0]} & {operands[1]}"
+            case GateType.OR:
+                return f"{operands[0]} | {operands[1]}"
+            case GateType.LSHIFT:
+                return f"{operands[0]} << {gate.shift_places}"
+            case GateType.RSHIFT:
+                return f"{operands[0]} >> {gate.shift_places}"
+        raise ValueError(f"Unknown gate type: {gate.type}")
 
     def get_wire_value(self, wire_name: str) -> int:
-        """Recursive function that returns signal value for given wire"""
+        """Returns signal value for given wire
+        Only the gates upstream of it that have not been evaluated are computed
+        """
         if wire_name not in self.wires:
-            for gate in self.gates:
-                if gate.output.name != wire_name:
-                    continue  # This is not the gate you're looking for!
-                if not gate.inputs_valid():
-                    newly_calculated_wires = {}
-                    for input_name in gate.invalid_input_names:
-                        newly_calculated_wires[input_name] = self.get_wire_value(
-                            input_name
-                        )
-                    gate.set_inputs(newly_calculated_wires)
-
-                gate.compute_output()
-                self.wires[gate.output.name] = gate.output.signal
-                break
-
+            for gate in self._upstream_order(wire_name):
+                self._compute(gate)
         return self.wires[wire_name]
 
     @staticmethod
@@ -38,6 +38,10 @@ class LogicGate(ABC):
         self.type = gate_type
         self.output = Wire(name=output_name)
 
+    @abstractproperty
+    def input_names(self) -> List[str]:
+        """Returns List of names of all input wires"""
+
     @abstractproperty
     def invalid_input_names(self) -> List[str]:
         """Returns List of all inputs with a signal value of None"""
@@ -64,6 +68,10 @@ class OneInputLogicGate(LogicGate):
         if self.input.name.isdigit():
             self.input.signal = int(self.input.name)
 
+    @property
+    def input_names(self) -> List[str]:
+        return [self.input.name]
+
     def inputs_valid(self) -> bool:
         return self.input.signal is not None
 
@@ -91,6 +99,10 @@ class TwoInputLogicGate(LogicGate):
         if self.input_b.name.isdigit():
             self.input_b.signal = int(self.input_b.name)
 
+    @property
+    def input_names(self) -> List[str]:
+        return [self.input_a.name, self.input_b.name]
+
     def inputs_valid(self) -> bool:
         return self.input_a.signal is not None and self.input_b.signal is not None
 
@@ -120,6 +132,10 @@ class ShiftLogicGate(LogicGate):
             self.input.signal = int(self.input.name)
         self.shift_places = int(shift_places)
 
+    @property
+    def input_names(self) -> List[str]:
+        return [self.input.name]
+
     def inputs_valid(self) -> bool:
         return self.input.signal is not None
 
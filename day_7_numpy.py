@@ -0,0 +1,48 @@
+"""NumPy batched evaluation of Day 7 Circuits"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from day_7_circuit import Circuit
+from day_7_gates import GateType, LogicGate
+
+
+def evaluate_batch(
+    circuit: Circuit,
+    inputs: Dict[str, np.ndarray],
+    output_names: Optional[Iterable[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Evaluate circuit for a whole batch of input assignments at once
+    inputs maps wire names to uint16 vectors (one element per assignment), which
+    override whatever drives those wires. Each gate is one NumPy operation over the
+    batch; wires that do not depend on any input stay uint16 scalars and broadcast.
+    Being uint16, NOT and LSHIFT results are cut to the puzzle's 16 bit signals.
+    """
+    return circuit.evaluate_with(
+        {
+            wire_name: np.asarray(signal, dtype=np.uint16)
+            for wire_name, signal in inputs.items()
+        },
+        _gate_output,
+        np.uint16,
+        output_names,
+    )
+
+
+def _gate_output(gate: LogicGate, operands) -> np.ndarray:
+    """Return gate output computed across the batch"""
+    match gate.type:
+        case GateType.DIRECT:
+            return operands[0]
+        case GateType.NOT:
+            return np.invert(operands[0])
+        case GateType.AND:
+            return np.bitwise_and(operands[0], operands[1])
+        case GateType.OR:
+            return np.bitwise_or(operands[0], operands[1])
+        case GateType.LSHIFT:
+            return np.left_shift(operands[0], np.uint16(gate.shift_places))
+        case GateType.RSHIFT:
+            return np.right_shift(operands[0], np.uint16(gate.shift_places))
+    raise ValueError(f"Unknown gate type: {gate.type}")
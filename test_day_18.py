@@ -1,5 +1,15 @@
-from day_18 import LightGrid, LightStatus
+from day_18 import (
+    LifeRule,
+    LightGrid,
+    LightStatus,
+    convert_text_to_binary,
+    get_grid_class,
+    read_input,
+)
 import pytest
+import day_18_parallel
+from day_18_hashlife import HashlifeLightGrid
+from day_18_numpy import NumpyLightGrid, TiledLightGrid
 
 """([initial light status,number of neighbours on],expected light status)"""
 test_parameters = [
@@ -35,3 +45,147 @@ def test_get_new_value(test_input, expected_output, mocker):
     output = test_grid._get_new_value((0, 0))
 
     assert output == expected_output.value
+
+
+@pytest.mark.parametrize(
+    "backend", ["list", "numpy", "packed", "tiled", "hashlife", "parallel"]
+)
+def test_execute_steps(backend):
+    """Test every backend reaches the worked example result with corners stuck on"""
+    test_grid = get_grid_class(backend)(read_input("day_18_test_input.txt"))
+    test_grid.execute_steps(5)
+    assert test_grid.number_of_lights_on == 17
+
+
+def test_parallel_worker_failure_raises(mocker):
+    """Test one failing worker stops the others rather than leaving them at the barrier"""
+    step_rows = day_18_parallel._step_rows
+
+    def fail_first_band(source, target, band, rule_table):
+        if band[0] == 1:
+            raise MemoryError
+        step_rows(source, target, band, rule_table)
+
+    mocker.patch("day_18_parallel._step_rows", side_effect=fail_first_band)
+    test_grid = get_grid_class("parallel")(read_input("day_18_test_input.txt"))
+    test_grid.processes = 3
+    with pytest.raises(RuntimeError):
+        test_grid.execute_steps(5)
+
+
+def test_hashlife_unbounded_glider():
+    """Test unbounded Hashlife moves a glider one cell diagonally every 4 steps"""
+    test_grid = HashlifeLightGrid(
+        [list(".#......"), list("..#....."), list("###....."), list("........")],
+        unbounded=True,
+    )
+    test_grid.execute_steps(4)
+    assert test_grid.light_status == [
+        list("........"),
+        list("..#....."),
+        list("...#...."),
+        list(".###...."),
+    ]
+    test_grid.execute_steps(2**40)
+    assert test_grid.number_of_lights_on == 5
+
+
+@pytest.mark.parametrize("backend", ["list", "numpy", "packed", "tiled"])
+def test_execute_steps_detect_cycles(backend):
+    """Test fast-forwarding a repeated generation matches stepping every generation"""
+    stepped_grid = get_grid_class(backend)(read_input("day_18_test_input.txt"))
+    stepped_grid.execute_steps(103)
+    cycle_grid = get_grid_class(backend)(read_input("day_18_test_input.txt"))
+    cycle_grid.execute_steps(10**12 + 103, detect_cycles=True)
+    assert cycle_grid.light_status == stepped_grid.light_status
+
+
+@pytest.mark.parametrize("tile_size", [3, 7])
+def test_small_tiles_match_numpy(tile_size):
+    """Test tile skipping, neighbour activation and buffer swaps across many tiles"""
+    sparse_status = [["."] * 40 for _ in range(40)]
+    for x, y in [(20, 10), (21, 10), (22, 10), (8, 30), (9, 31), (10, 29), (10, 30)]:
+        sparse_status[y][x] = "#"
+    for light_status in [read_input("day_18_input.txt"), sparse_status]:
+        tiled_grid = TiledLightGrid(light_status, tile_size=tile_size)
+        numpy_grid = NumpyLightGrid(light_status)
+        for _ in range(12):
+            tiled_grid.execute_steps(5)
+            numpy_grid.execute_steps(5)
+            assert tiled_grid.light_status == numpy_grid.light_status
+    assert not tiled_grid.changed_tiles.all()
+
+
+@pytest.mark.parametrize("backend", ["list", "numpy", "packed", "tiled"])
+def test_binary_round_trip(backend, tmp_path):
+    """Test text input converted to the binary format loads and saves unchanged"""
+    binary_filename = tmp_path / "grid.bin"
+    saved_filename = tmp_path / "saved.bin"
+    convert_text_to_binary("day_18_test_input.txt", binary_filename)
+
+    test_grid = get_grid_class(backend).from_binary(binary_filename)
+    assert test_grid.light_status == read_input("day_18_test_input.txt")
+
+    test_grid.to_binary(saved_filename)
+    assert saved_filename.read_bytes() == binary_filename.read_bytes()
+
+
+@pytest.mark.parametrize("backend", ["list", "numpy", "packed"])
+def test_iter_generations(backend):
+    """Test sampled generations and deltas match stepping the grid directly"""
+    test_grid = get_grid_class(backend)(read_input("day_18_test_input.txt"))
+    generations = list(test_grid.iter_generations(6, every=2, deltas=True))
+    assert [generation.step for generation in generations] == [0, 2, 4, 6]
+
+    previous_status = LightGrid(read_input("day_18_test_input.txt"))
+    previous_status.set_corners_on()
+    for generation in generations[1:]:
+        expected_grid = LightGrid(read_input("day_18_test_input.txt"))
+        expected_grid.execute_steps(generation.step)
+        assert generation.lights_on == expected_grid.number_of_lights_on
+        assert set(generation.changed) == {
+            (x, y)
+            for y, row in enumerate(expected_grid.light_status)
+            for x, status in enumerate(row)
+            if status != previous_status.light_status[y][x]
+        }
+        previous_status = expected_grid
+
+
+@pytest.mark.parametrize("every", [0, -2])
+def test_iter_generations_rejects_every_below_one(every):
+    """Test a bad sampling interval is rejected before any generation is stepped"""
+    test_grid = LightGrid(read_input("day_18_test_input.txt"))
+    with pytest.raises(ValueError):
+        test_grid.iter_generations(6, every=every)
+
+
+@pytest.mark.parametrize("rule", ["B3/S23", "B36/S23", "B2/S", "B1357/S1357"])
+def test_rule_backends_agree(rule):
+    """Test pure-Python and vectorized steppers agree for Life-like rules"""
+    life_rule = LifeRule.from_string(rule)
+    assert str(life_rule) == rule
+    grids = [
+        get_grid_class(backend)(read_input("day_18_test_input.txt"), rule=life_rule)
+        for backend in ["list", "numpy", "tiled"]
+    ]
+    for test_grid in grids:
+        test_grid.execute_steps(4)
+    assert grids[0].light_status == grids[1].light_status == grids[2].light_status
+
+
+@pytest.mark.parametrize("rule", ["23/3", "S23/B3", "B3/S9", "B3S23", "Conway"])
+def test_rule_from_string_rejects_bad_notation(rule):
+    """Test rules must be B<digits 0-8>/S<digits 0-8>"""
+    with pytest.raises(ValueError):
+        LifeRule.from_string(rule)
+
+
+@pytest.mark.parametrize("backend", ["packed", "hashlife"])
+def test_conway_only_backends_reject_other_rules(backend):
+    """Test backends hard-wired to B3/S23 refuse other rules rather than ignore them"""
+    light_status = read_input("day_18_test_input.txt")
+    grid_class = get_grid_class(backend)
+    grid_class(light_status, rule=LifeRule.from_string("B3/S23"))
+    with pytest.raises(ValueError):
+        grid_class(light_status, rule=LifeRule.from_string("B36/S23"))
@@ -0,0 +1,173 @@
+"""Tests for Day 6"""
+
+import pytest
+from day_6 import (
+    LightController,
+    LightGrid,
+    LightGridv2,
+    PackedLightGrid,
+    Point,
+    execute_tiled,
+    get_grid_classes,
+    load_checkpoint,
+)
+from day_6_numpy import CompressedLightEvaluator, DifferenceLightGridv2
+
+test_commands = [
+    "turn on 0,0 through 9,9",
+    "toggle 2,3 through 7,12",
+    "turn off 5,0 through 14,4",
+    "toggle 0,0 through 14,14",
+    "turn off 3,3 through 3,3",
+]
+
+
+def run_commands(grid):
+    """Apply test_commands to grid and return it"""
+    controller = LightController()
+    for command in test_commands:
+        controller.execute_command(command, grid)
+    return grid
+
+
+@pytest.mark.parametrize("backend", ["numpy", "bitset", "difference"])
+def test_backend_matches_set_grids(backend):
+    """Test alternative grid backends agree with LightGrid and LightGridv2"""
+    grid_class, grid_class_v2 = get_grid_classes(backend)
+    assert (
+        run_commands(grid_class((15, 15))).number_of_lights_on
+        == run_commands(LightGrid((15, 15))).number_of_lights_on
+    )
+    assert (
+        run_commands(grid_class_v2((15, 15))).total_brightness
+        == run_commands(LightGridv2((15, 15))).total_brightness
+    )
+
+
+@pytest.mark.parametrize("cell_cost", [0, 1_000])
+def test_difference_grid_defers_until_off_overlaps(cell_cost, mocker):
+    """Test both ways of applying pending increases, and offs clear of them"""
+    mocker.patch.object(DifferenceLightGridv2, "DIFFERENCE_CELL_COST", cell_cost)
+    controller = LightController()
+    grid = DifferenceLightGridv2((15, 15))
+    expected = LightGridv2((15, 15))
+    for command in [
+        "toggle 0,0 through 4,4",
+        "turn on 2,2 through 6,6",
+        "turn off 10,10 through 14,14",
+    ]:
+        controller.execute_command(command, grid)
+        controller.execute_command(command, expected)
+    assert grid.has_pending
+    controller.execute_command("turn off 3,3 through 12,12", grid)
+    controller.execute_command("turn off 3,3 through 12,12", expected)
+    assert not grid.has_pending
+    assert grid.total_brightness == expected.total_brightness
+
+
+def test_compressed_evaluator_matches_set_grids():
+    """Test CompressedLightEvaluator agrees with LightGrid and LightGridv2"""
+    commands = [LightController._parse_command(command) for command in test_commands]
+    evaluator = CompressedLightEvaluator(commands)
+    assert (
+        evaluator.number_of_lights_on
+        == run_commands(LightGrid((15, 15))).number_of_lights_on
+    )
+    assert (
+        evaluator.total_brightness
+        == run_commands(LightGridv2((15, 15))).total_brightness
+    )
+
+
+def test_parse_commands_matches_parse_command():
+    """Test batch parsed command array unpacks to the same LightCommands"""
+    commands = LightController.parse_commands("\n".join(test_commands))
+    assert [
+        LightController.unpack_command(commands, index)
+        for index in range(len(test_commands))
+    ] == [LightController._parse_command(command) for command in test_commands]
+
+
+def test_execute_stream_from_file(tmp_path, monkeypatch):
+    """Test streaming commands from a file updates every grid and reports progress"""
+    command_file = tmp_path / "commands.txt"
+    command_file.write_text("\n".join(test_commands) + "\n", encoding="utf-8")
+    monkeypatch.setattr("day_6.PROGRESS_INTERVAL", 2)
+    progress_counts = []
+    lights, lights_v2 = LightGrid((15, 15)), LightGridv2((15, 15))
+
+    executed = LightController().execute_stream(
+        command_file,
+        lights,
+        lights_v2,
+        progress=lambda count, rate: progress_counts.append(count),
+    )
+
+    assert executed == len(test_commands)
+    assert progress_counts == [2, 4]
+    assert lights.lights_on == run_commands(LightGrid((15, 15))).lights_on
+    assert lights_v2.lights_on == run_commands(LightGridv2((15, 15))).lights_on
+
+
+@pytest.mark.parametrize(
+    "grid_class,result",
+    [(PackedLightGrid, "number_of_lights_on"), (LightGridv2, "total_brightness")],
+)
+def test_execute_tiled_matches_single_grid(grid_class, result):
+    """Test banded multi-process execution sums to the single grid result"""
+    commands = LightController.parse_commands("\n".join(test_commands))
+    expected = getattr(run_commands(grid_class((15, 15))), result)
+    assert execute_tiled(commands, grid_class, (15, 15), bands=4) == expected
+
+
+@pytest.mark.parametrize("backend", ["set", "numpy", "bitset", "difference"])
+def test_replay_resumes_from_checkpoint(backend, tmp_path):
+    """Test a replay interrupted after a checkpoint resumes to the same result"""
+    checkpoint_path = tmp_path / "grid.ckpt"
+    controller = LightController()
+    for grid_class in get_grid_classes(backend):
+        controller.replay(test_commands[:3], grid_class, (15, 15), checkpoint_path, 2)
+        grid, offset = load_checkpoint(checkpoint_path, grid_class)
+        assert offset == 3
+
+        grid = controller.replay(test_commands, grid_class, (15, 15), checkpoint_path)
+        expected = run_commands(grid_class((15, 15)))
+        for result in ("number_of_lights_on", "total_brightness"):
+            assert getattr(grid, result, None) == getattr(expected, result, None)
+        checkpoint_path.unlink()
+
+
+test_rectangles = [
+    (Point(0, 0), Point(14, 14)),
+    (Point(2, 3), Point(7, 12)),
+    (Point(9, 9), Point(3, 1)),
+    (Point(5, 5), Point(5, 5)),
+]
+
+
+@pytest.mark.parametrize("backend", ["set", "numpy", "bitset", "difference"])
+def test_region_index_matches_cell_totals(backend):
+    """Test summed-area table rectangle totals match summing the grid cells"""
+    expected_lights = run_commands(LightGrid((15, 15))).lights_on
+    expected_brightness = run_commands(LightGridv2((15, 15))).lights_on
+
+    def inside(light, rectangle):
+        (x0, x1), (y0, y1) = (sorted(axis) for axis in zip(*rectangle))
+        return x0 <= light.x <= x1 and y0 <= light.y <= y1
+
+    grid_class, grid_class_v2 = get_grid_classes(backend)
+    lights_index = run_commands(grid_class((15, 15))).build_region_index()
+    brightness_index = run_commands(grid_class_v2((15, 15))).build_region_index()
+
+    assert lights_index.query_many(test_rectangles) == [
+        sum(inside(light, rectangle) for light in expected_lights)
+        for rectangle in test_rectangles
+    ]
+    assert brightness_index.query_many(test_rectangles) == [
+        sum(
+            value
+            for light, value in expected_brightness.items()
+            if inside(light, rectangle)
+        )
+        for rectangle in test_rectangles
+    ]
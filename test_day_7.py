@@ -0,0 +1,178 @@
+"""Tests for Day 7"""
+
+import numpy as np
+import pytest
+from day_7_bitslice import evaluate_bitsliced
+from day_7_circuit import Circuit
+from day_7_numpy import evaluate_batch
+
+test_instructions = [
+    "x AND y -> d",
+    "x OR y -> e",
+    "x LSHIFT 2 -> f",
+    "y RSHIFT 2 -> g",
+    "123 -> x",
+    "456 -> y",
+]
+
+test_parameters = [("d", 72), ("e", 507), ("f", 492), ("g", 114), ("x", 123), ("y", 456)]
+
+
+@pytest.fixture
+def test_circuit():
+    circuit = Circuit()
+    for instruction in test_instructions:
+        circuit.add_gate(instruction)
+    return circuit
+
+
+@pytest.mark.parametrize("wire_name,expected_output", test_parameters)
+def test_get_wire_value(test_circuit, wire_name, expected_output):
+    """Test for Circuit.get_wire_value"""
+    assert test_circuit.get_wire_value(wire_name) == expected_output
+
+
+def test_deep_circuit_has_no_recursion_limit():
+    """Test a long chain of gates evaluates without RecursionError"""
+    circuit = Circuit()
+    circuit.add_gate("1 -> w0")
+    for wire in range(1, 100_000):
+        circuit.add_gate(f"w{wire - 1} -> w{wire}")
+    assert circuit.get_wire_value("w99999") == 1
+
+
+def test_feedback_loop_is_rejected():
+    """Test a circuit with a loop raises ValueError rather than recursing forever"""
+    circuit = Circuit()
+    circuit.add_gate("a AND b -> c")
+    circuit.add_gate("c -> a")
+    circuit.add_gate("1 -> b")
+    with pytest.raises(ValueError):
+        circuit.get_wire_value("c")
+
+
+def test_undriven_wire_only_affects_its_dependents():
+    """Test a gate reading an undriven wire does not stop unrelated wires resolving"""
+    circuit = Circuit()
+    circuit.add_gate("1 -> a")
+    circuit.add_gate("q AND r -> z")
+    assert circuit.get_wire_value("a") == 1
+    with pytest.raises(ValueError, match="Wire [qr] is not driven"):
+        circuit.get_wire_value("z")
+    with pytest.raises(ValueError, match="Wire [qr] is not driven"):
+        circuit.evaluate()
+
+
+def test_compiled_circuit_matches_get_wire_value(test_circuit):
+    """Test compiled netlist gives every wire value and honours input overrides"""
+    compiled_circuit = test_circuit.compile(input_names=["y"])
+    assert compiled_circuit(456) == {
+        wire_name: test_circuit.get_wire_value(wire_name)
+        for wire_name, _ in test_parameters
+    }
+    assert compiled_circuit(0)["e"] == 123
+
+
+def test_override_wire_recomputes_downstream_wires(test_circuit):
+    """Test overriding a wire updates its dependents and leaves other wires alone"""
+    test_circuit.evaluate()
+    test_circuit.override_wire("y", 0)
+    assert test_circuit.get_wire_value("d") == 0
+    assert test_circuit.get_wire_value("e") == 123
+    assert test_circuit.get_wire_value("f") == 492
+    assert test_circuit.get_wire_value("g") == 0
+
+
+def test_replace_gate_recomputes_downstream_wires(test_circuit):
+    """Test replacing gates, including one that reads a wire later in the order"""
+    test_circuit.add_gate("d -> h")
+    test_circuit.evaluate()
+    test_circuit.replace_gate("h RSHIFT 1 -> g")
+    assert test_circuit.get_wire_value("g") == 36
+    test_circuit.replace_gate("y -> x")
+    assert [test_circuit.get_wire_value(wire) for wire in "defgh"] == [
+        456,
+        456,
+        1824,
+        228,
+        456,
+    ]
+
+
+def test_evaluate_batch_matches_compiled_circuit(test_circuit):
+    """Test batch evaluation agrees with scalar evaluation, masked to 16 bits"""
+    test_circuit.add_gate("NOT d -> h")
+    compiled_circuit = test_circuit.compile(input_names=["x", "y"])
+    x_signals = np.array([0, 1, 123, 65535], dtype=np.uint16)
+    y_signals = np.array([0, 65535, 456, 32768], dtype=np.uint16)
+    outputs = evaluate_batch(test_circuit, {"x": x_signals, "y": y_signals})
+    for index, (x_signal, y_signal) in enumerate(zip(x_signals, y_signals)):
+        expected = compiled_circuit(int(x_signal), int(y_signal))
+        for wire_name, signal in expected.items():
+            assert outputs[wire_name][index] == signal & 0xFFFF
+
+
+def test_evaluate_bitsliced_matches_evaluate_batch(test_circuit):
+    """Test bit-sliced evaluation agrees with NumPy batch evaluation"""
+    test_circuit.add_gate("NOT d -> h")
+    test_circuit.add_gate("h LSHIFT 3 -> i")
+    x_signals = [0, 1, 123, 65535, 4097]
+    y_signals = [0, 65535, 456, 32768, 255]
+    inputs = {"x": x_signals, "y": y_signals}
+    expected = evaluate_batch(
+        test_circuit, {wire: np.array(signals) for wire, signals in inputs.items()}
+    )
+    outputs = evaluate_bitsliced(test_circuit, inputs)
+    assert outputs.keys() == expected.keys()
+    for wire_name, signals in outputs.items():
+        assert signals == list(np.broadcast_to(expected[wire_name], len(x_signals)))
+
+
+def test_override_wire_after_add_gate_updates_cached_wires(test_circuit):
+    """Test overrides reach wires evaluated before a gate was added"""
+    test_circuit.evaluate()
+    test_circuit.add_gate("e -> h")
+    test_circuit.override_wire("y", 0)
+    assert test_circuit.get_wire_value("d") == 0
+    assert test_circuit.get_wire_value("h") == 123
+
+    circuit = Circuit()
+    circuit.add_gate("5 -> x")
+    circuit.add_gate("x LSHIFT 1 -> y")
+    assert circuit.get_wire_value("y") == 10
+    circuit.add_gate("y OR 1 -> z")
+    circuit.override_wire("x", 1)
+    assert circuit.get_wire_value("y") == 2
+    assert circuit.get_wire_value("z") == 3
+
+
+def test_replace_gate_after_add_gate_updates_cached_wires(test_circuit):
+    """Test a replaced gate reaches wires evaluated before a gate was added"""
+    test_circuit.evaluate()
+    test_circuit.add_gate("d -> h")
+    test_circuit.replace_gate("y -> x")
+    assert test_circuit.get_wire_value("d") == 456
+    assert test_circuit.get_wire_value("h") == 456
+
+
+def test_override_wire_on_undriven_input():
+    """Test overriding a wire no gate drives updates the gates reading it"""
+    circuit = Circuit()
+    circuit.add_gate("x AND y -> d")
+    circuit.add_gate("d OR y -> e")
+    circuit.override_wire("x", 3)
+    circuit.override_wire("y", 5)
+    circuit.evaluate()
+    circuit.override_wire("x", 2)
+    assert circuit.compile(["x", "y"])(2, 5) == {"d": 0, "e": 5, "x": 2, "y": 5}
+    assert [circuit.get_wire_value(wire) for wire in "de"] == [0, 5]
+
+
+def test_replace_gate_forming_loop_leaves_circuit_unchanged(test_circuit):
+    """Test a replacement that would form a feedback loop is rejected up front"""
+    test_circuit.evaluate()
+    with pytest.raises(ValueError):
+        test_circuit.replace_gate("d -> x")
+    assert test_circuit.gates_by_output["x"].input_names == ["123"]
+    test_circuit.override_wire("y", 0)
+    assert test_circuit.get_wire_value("d") == 0